@@ -0,0 +1,264 @@
+"""
+Incrementally maintained quiz and question analytics.
+
+Graded attempts are folded into an AnalyticsDelta in memory and applied as
+counter increments (upserts) in the same transaction that writes the attempts.
+Dashboards then read pre-aggregated rows, O(questions) regardless of how many
+attempts exist. rebuild_analytics() reconciles the aggregates from raw attempts.
+
+Per-question counters are stamped with the version of the answer key they were
+graded against (the quiz snapshot version, bumped by every quiz write) and are
+dropped if the quiz changed before they were applied, so a cached key can never
+credit a question id that SQLite has meanwhile reused for a different question.
+"""
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Attempt, Question, QuestionOptionStats, QuestionStats, QuizScoreStats, QuizSnapshot, QuizStats
+)
+
+REBUILD_YIELD_PER = 1000
+
+
+class AnalyticsDelta:
+    """Pending counter increments for a batch of attempts."""
+
+    def __init__(self):
+        self.quizzes: Dict[int, List[int]] = {}  # quiz_id -> [attempts, score_sum, total_sum]
+        self.scores: Counter = Counter()  # (quiz_id, score) -> count
+        self.questions: Dict[int, List[int]] = {}  # question_id -> [quiz_id, attempts, correct, skipped]
+        self.options: Counter = Counter()  # (question_id, option_index) -> count
+        self.versions: Dict[int, int] = {}  # quiz_id -> soru sayaçlarının ait olduğu anahtar sürümü
+
+    def __bool__(self) -> bool:
+        return bool(self.quizzes)
+
+    def record(
+        self,
+        quiz_id: int,
+        question_ids: Sequence[int],
+        answers: Sequence[Optional[int]],
+        flags: Sequence[int],
+        score: int,
+        version: Optional[int] = None
+    ) -> None:
+        """Fold one graded attempt into the delta; version stamps the answer key it was graded with."""
+        if version is not None:
+            if self.versions.get(quiz_id, version) != version:
+                # Tampon dolarken anahtar yenilendi: eski sürümle biriken soru sayaçları geçersiz
+                self._drop_questions({quiz_id})
+            self.versions[quiz_id] = version
+
+        quiz = self.quizzes.setdefault(quiz_id, [0, 0, 0])
+        quiz[0] += 1
+        quiz[1] += score
+        quiz[2] += len(question_ids)
+        self.scores[(quiz_id, score)] += 1
+
+        questions = self.questions
+        options = self.options
+        for question_id, answer, flag in zip(question_ids, answers, flags):
+            stats = questions.get(question_id)
+            if stats is None:
+                stats = questions[question_id] = [quiz_id, 0, 0, 0]
+            stats[1] += 1
+            stats[2] += flag
+            if answer is None:
+                stats[3] += 1
+            else:
+                options[(question_id, answer)] += 1
+
+    def merge(self, other: "AnalyticsDelta") -> None:
+        """Add an older delta into this one; its question counters of re-versioned quizzes are dropped."""
+        stale = set(
+            quiz_id for quiz_id, version in other.versions.items()
+            if self.versions.get(quiz_id, version) != version
+        )
+        for quiz_id, values in other.quizzes.items():
+            quiz = self.quizzes.setdefault(quiz_id, [0, 0, 0])
+            for index, value in enumerate(values):
+                quiz[index] += value
+        merged = set()
+        for question_id, values in other.questions.items():
+            if values[0] in stale:
+                continue
+            merged.add(question_id)
+            stats = self.questions.setdefault(question_id, [values[0], 0, 0, 0])
+            for index in range(1, 4):
+                stats[index] += values[index]
+        for quiz_id, version in other.versions.items():
+            self.versions.setdefault(quiz_id, version)
+        self.scores.update(other.scores)
+        self.options.update({key: count for key, count in other.options.items() if key[0] in merged})
+
+    def _drop_questions(self, quiz_ids) -> None:
+        dropped = set(question_id for question_id, v in self.questions.items() if v[0] in quiz_ids)
+        for question_id in dropped:
+            del self.questions[question_id]
+        for key in [key for key in self.options if key[0] in dropped]:
+            del self.options[key]
+
+    def discard_quizzes(self, quiz_ids) -> None:
+        """Drop pending increments of quizzes that no longer exist."""
+        quiz_ids = set(quiz_ids)
+        for quiz_id in quiz_ids:
+            self.quizzes.pop(quiz_id, None)
+            self.versions.pop(quiz_id, None)
+        self._drop_questions(quiz_ids)
+        for key in [key for key in self.scores if key[0] in quiz_ids]:
+            del self.scores[key]
+
+    def apply(self, db: Session) -> None:
+        """Write the increments; questions of quizzes changed or deleted in the meantime are skipped."""
+        if not self:
+            return
+
+        _increment(db, QuizStats, ["quiz_id"], [
+            {"quiz_id": quiz_id, "attempts": v[0], "score_sum": v[1], "total_sum": v[2]}
+            for quiz_id, v in self.quizzes.items()
+        ])
+        _increment(db, QuizScoreStats, ["quiz_id", "score"], [
+            {"quiz_id": quiz_id, "score": score, "count": count}
+            for (quiz_id, score), count in self.scores.items()
+        ])
+
+        if self.versions:
+            current = dict(db.execute(
+                select(QuizSnapshot.quiz_id, QuizSnapshot.version)
+                .where(QuizSnapshot.quiz_id.in_(list(self.versions)))
+            ).all())
+            self._drop_questions(set(
+                quiz_id for quiz_id, version in self.versions.items() if current.get(quiz_id, 0) != version
+            ))
+
+        existing = set(db.scalars(select(Question.id).where(Question.id.in_(list(self.questions)))))
+        _increment(db, QuestionStats, ["question_id"], [
+            {"question_id": question_id, "quiz_id": v[0], "attempts": v[1], "correct": v[2], "skipped": v[3]}
+            for question_id, v in self.questions.items() if question_id in existing
+        ])
+        _increment(db, QuestionOptionStats, ["question_id", "option_index"], [
+            {"question_id": question_id, "option_index": option_index, "count": count}
+            for (question_id, option_index), count in self.options.items() if question_id in existing
+        ])
+
+
+def _increment(db: Session, model, key_columns: List[str], rows: List[Dict[str, Any]]) -> None:
+    """Insert rows or add their counters to the existing ones."""
+    if not rows:
+        return
+
+    dialect_insert = sqlite.insert if db.bind.dialect.name == "sqlite" else postgresql.insert
+    stmt = dialect_insert(model)
+    table = model.__table__
+    counters = [column for column in rows[0] if column not in key_columns and column != "quiz_id"]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={column: table.c[column] + stmt.excluded[column] for column in counters}
+    )
+    db.execute(stmt, rows)
+
+
+def load_quiz_analytics(db: Session, quiz_id: int) -> Dict[str, Any]:
+    """Read the aggregated analytics of a quiz."""
+    quiz_stats = db.execute(
+        select(QuizStats.attempts, QuizStats.score_sum, QuizStats.total_sum)
+        .where(QuizStats.quiz_id == quiz_id)
+    ).first()
+    attempts, score_sum, total_sum = quiz_stats or (0, 0, 0)
+
+    score_distribution = {
+        str(row[0]): row[1] for row in db.execute(
+            select(QuizScoreStats.score, QuizScoreStats.count)
+            .where(QuizScoreStats.quiz_id == quiz_id)
+            .order_by(QuizScoreStats.score)
+        )
+    }
+
+    question_rows = db.execute(
+        select(
+            Question.id, Question.text, Question.options, Question.order,
+            QuestionStats.attempts, QuestionStats.correct, QuestionStats.skipped
+        )
+        .outerjoin(QuestionStats, QuestionStats.question_id == Question.id)
+        .where(Question.quiz_id == quiz_id)
+        .order_by(Question.order, Question.id)
+    ).all()
+
+    option_counts: Dict[int, Dict[int, int]] = {}
+    for row in db.execute(
+        select(QuestionOptionStats.question_id, QuestionOptionStats.option_index, QuestionOptionStats.count)
+        .join(Question, Question.id == QuestionOptionStats.question_id)
+        .where(Question.quiz_id == quiz_id)
+    ):
+        option_counts.setdefault(row[0], {})[row[1]] = row[2]
+
+    questions = []
+    for row in question_rows:
+        question_attempts = row[4] or 0
+        counts = option_counts.get(row[0], {})
+        questions.append({
+            "question_id": row[0],
+            "text": row[1],
+            "order": row[3],
+            "attempts": question_attempts,
+            "correct": row[5] or 0,
+            "skipped": row[6] or 0,
+            "correct_rate": (row[5] or 0) / question_attempts if question_attempts else None,
+            "answer_distribution": [counts.get(index, 0) for index in range(len(row[2]))],
+        })
+
+    return {
+        "quiz_id": quiz_id,
+        "attempts": attempts,
+        "average_score": score_sum / attempts if attempts else None,
+        "average_percent": 100 * score_sum / total_sum if total_sum else None,
+        "score_distribution": score_distribution,
+        "questions": questions,
+    }
+
+
+def rebuild_analytics(db: Session) -> int:
+    """Recompute every aggregate from raw attempts; returns attempts processed."""
+    for model in (QuestionOptionStats, QuestionStats, QuizScoreStats, QuizStats):
+        db.execute(delete(model))
+
+    # Soru bazlı istatistikler sadece mevcut sorular oluşturulduktan sonraki denemelerden hesaplanır
+    keys = {}
+    for row in db.execute(
+        select(Question.quiz_id, Question.id, Question.correct, Question.created_at)
+        .order_by(Question.quiz_id, Question.order, Question.id)
+    ):
+        key = keys.setdefault(row[0], {"ids": [], "correct": [], "since": row[3]})
+        key["ids"].append(row[1])
+        key["correct"].append(row[2])
+        if row[3] is not None and (key["since"] is None or row[3] > key["since"]):
+            key["since"] = row[3]
+
+    delta = AnalyticsDelta()
+    processed = 0
+    attempts = db.execute(
+        select(Attempt.quiz_id, Attempt.answers, Attempt.score, Attempt.total, Attempt.created_at)
+        .execution_options(stream_results=True, yield_per=REBUILD_YIELD_PER)
+    )
+    for quiz_id, answers, score, total, created_at in attempts:
+        key = keys.get(quiz_id)
+        if (
+            key is not None and len(key["ids"]) == total == len(answers)
+            and (key["since"] is None or created_at is None or created_at >= key["since"])
+        ):
+            flags = [int(answer == correct) for answer, correct in zip(answers, key["correct"])]
+            delta.record(quiz_id, key["ids"], answers, flags, score)
+        else:
+            # Sorular değişmişse sadece quiz geneli istatistiklere eklenir
+            delta.record(quiz_id, [], [], [], score)
+            delta.quizzes[quiz_id][2] += total
+        processed += 1
+
+    delta.apply(db)
+    db.commit()
+    return processed
@@ -1,15 +1,19 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import update
 from sqlalchemy.orm import Session
+import hashlib
 import os
+import secrets
 from dotenv import load_dotenv
 
-from app.database import get_db
-from app.models import User
+from app.database import SessionLocal
+from app.models import RefreshToken, User
+from app.revocation import session_denylist
 from app.schemas import TokenData
 
 load_dotenv()
@@ -18,6 +22,7 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -56,10 +61,104 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+def hash_refresh_token(token: str) -> str:
+    """Refresh tokens are random, so a fast hash is enough (no bcrypt)."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def create_refresh_token(db: Session, user_id: int, session_id: str) -> str:
+    """Store a new refresh token of a login session; the caller commits."""
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        token_hash=hash_refresh_token(token),
+        user_id=user_id,
+        session_id=session_id,
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    return token
+
+def create_session_tokens(db: Session, user: User, session_id: Optional[str] = None) -> dict:
+    """Issue an access/refresh token pair for a (new or existing) login session and commit."""
+    session_id = session_id or secrets.token_hex(16)
+    refresh_token = create_refresh_token(db, user.id, session_id)
+    db.commit()
+    return {
+        "access_token": create_access_token(data={"sub": user.email, "sid": session_id}),
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+def revoke_session(db: Session, session_id: str) -> None:
+    """Revoke every refresh and access token of a login session and commit."""
+    now = datetime.utcnow()
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.session_id == session_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+    # Oturumun access token'ları en geç bu süre sonunda kendiliğinden geçersiz olur
+    session_denylist.revoke(db, session_id, now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    db.commit()
+
+def rotate_refresh_token(db: Session, token: str) -> Optional[Tuple[User, str]]:
+    """Consume a refresh token; returns (user, session id) or None if it is not usable.
+
+    Presenting an already used token means it was copied, so the whole session
+    is revoked.
+    """
+    stored = db.query(RefreshToken).filter(RefreshToken.token_hash == hash_refresh_token(token)).first()
+    if stored is None or stored.expires_at <= datetime.utcnow():
+        return None
+
+    # Koşullu güncelleme sayesinde aynı token iki kez aynı anda kullanılamaz
+    consumed = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == stored.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    ).rowcount
+    if not consumed:
+        db.rollback()
+        revoke_session(db, stored.session_id)
+        return None
+
+    user = db.query(User).filter(User.id == stored.user_id).first()
+    if user is None or not user.is_active or session_denylist.is_revoked(stored.session_id):
+        db.commit()
+        return None
+    return user, stored.session_id
+
+def purge_expired_refresh_tokens(db: Session) -> int:
+    """Delete refresh tokens that can no longer be used."""
+    deleted = db.query(RefreshToken).filter(
+        RefreshToken.expires_at <= datetime.utcnow()
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+def decode_access_token(token: str) -> Optional[dict]:
+    """Verify a JWT access token and check its session against the denylist."""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    session_id = payload.get("sid")
+    if session_id is not None and session_denylist.is_revoked(session_id):
+        return None
+    return payload
+
+def get_user_from_token(db: Session, token: str) -> Optional[User]:
+    """Resolve a JWT access token to its user, or None if it is invalid."""
+    payload = decode_access_token(token)
+    if payload is None:
+        return None
+    email: str = payload.get("sub")
+    if email is None:
+        return None
+    token_data = TokenData(email=email)
+    
+    return db.query(User).filter(User.email == token_data.email).first()
+
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
     """Get the current authenticated user from JWT token."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -67,22 +166,15 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
-    except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.email == token_data.email).first()
+    # Kendi kısa oturumu: bağlantı sonraki bağımlılıklar threadpool'da sıra beklerken
+    # tutulmaz, istek oturumu da ancak endpoint ihtiyaç duyarsa bağlantı alır
+    with SessionLocal() as db:
+        user = get_user_from_token(db, credentials.credentials)
     if user is None:
         raise credentials_exception
     return user
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get the current active user."""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.schema import AddConstraint, CreateIndex
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -9,11 +10,29 @@ load_dotenv()
 # Database URL - fallback to SQLite for development
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./ai_quiz_builder.db")
 
+# Connection pool settings (per worker process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
 # Handle SQLite vs PostgreSQL
 if DATABASE_URL.startswith("sqlite"):
     engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record):
+        # SQLite foreign key'leri (ve ON DELETE CASCADE'i) ancak bu ayarla uygular
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
 else:
-    engine = create_engine(DATABASE_URL)
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True
+    )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -27,4 +46,112 @@ def get_db():
         db.close()
 
 def create_tables():
-    Base.metadata.create_all(bind=engine) 
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    ensure_foreign_key_cascades()
+    ensure_indexes()
+
+def ensure_indexes():
+    """Create indexes declared on tables that already existed when they were added."""
+    # create_all mevcut tablolara yeni indeks eklemez (ör. questions.quiz_id)
+    inspector = inspect(engine)
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing.extend(index for index in table.indexes if index.name not in existing)
+    if not missing:
+        return []
+
+    # IF NOT EXISTS: aynı anda başlayan worker'lar birbirini bozmaz
+    with engine.begin() as conn:
+        for index in missing:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+    names = [index.name for index in missing]
+    print(f"Created missing indexes: {', '.join(names)}")
+    return names
+
+def _missing_cascades(inspector, table):
+    """Foreign keys of a table declared with ondelete that the database lacks."""
+    declared = {
+        (fk.parent.name, fk.column.table.name) for fk in table.foreign_keys if fk.ondelete
+    }
+    if not declared:
+        return set()
+    existing = {
+        (fk["constrained_columns"][0], fk["referred_table"])
+        for fk in inspector.get_foreign_keys(table.name)
+        if (fk.get("options") or {}).get("ondelete", "").upper() == "CASCADE"
+    }
+    return declared - existing
+
+def ensure_foreign_key_cascades():
+    """Add ON DELETE CASCADE to foreign keys of tables created before it was declared."""
+    # create_all mevcut tabloları değiştirmez; eski veritabanları burada bir kez taşınır
+    inspector = inspect(engine)
+    tables = []
+    for table in Base.metadata.sorted_tables:
+        if inspector.has_table(table.name):
+            missing = _missing_cascades(inspector, table)
+            if missing:
+                tables.append((table, missing))
+    if not tables:
+        return []
+
+    if engine.dialect.name == "sqlite":
+        _rebuild_sqlite_tables(inspector, tables)
+    else:
+        with engine.begin() as conn:
+            for table, missing in tables:
+                for fk in inspector.get_foreign_keys(table.name):
+                    if (fk["constrained_columns"][0], fk["referred_table"]) in missing:
+                        conn.execute(text(f'ALTER TABLE {table.name} DROP CONSTRAINT "{fk["name"]}"'))
+                for constraint in table.foreign_key_constraints:
+                    if (constraint.elements[0].parent.name, constraint.referred_table.name) in missing:
+                        conn.execute(AddConstraint(constraint))
+
+    names = [table.name for table, _ in tables]
+    print(f"Added ON DELETE CASCADE foreign keys to: {', '.join(names)}")
+    return names
+
+def _rebuild_sqlite_tables(inspector, tables):
+    """SQLite can't alter constraints, so each table is recreated and its rows copied."""
+    with engine.connect() as conn:
+        # Taşıma sırasında kontrol kapalı; yeniden adlandırma diğer tablolardaki referansları değiştirmesin
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        conn.exec_driver_sql("PRAGMA legacy_alter_table=ON")
+        try:
+            for table, _ in tables:
+                old_name = f"{table.name}__old"
+                columns = [column["name"] for column in inspector.get_columns(table.name)]
+                column_list = ", ".join(f'"{name}"' for name in columns if name in table.c)
+                for index in inspector.get_indexes(table.name):
+                    conn.exec_driver_sql(f'DROP INDEX "{index["name"]}"')
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} RENAME TO {old_name}")
+                table.create(conn)
+                conn.exec_driver_sql(f"INSERT INTO {table.name} ({column_list}) SELECT {column_list} FROM {old_name}")
+                conn.exec_driver_sql(f"DROP TABLE {old_name}")
+                # Eskiden silinen quizlerden kalan yetim kayıtlar temizlenir
+                for fk in table.foreign_keys:
+                    if fk.ondelete:
+                        conn.exec_driver_sql(
+                            f"DELETE FROM {table.name} WHERE {fk.parent.name} IS NOT NULL AND "
+                            f"{fk.parent.name} NOT IN (SELECT {fk.column.name} FROM {fk.column.table.name})"
+                        )
+            conn.commit()
+        finally:
+            conn.rollback()
+            conn.exec_driver_sql("PRAGMA legacy_alter_table=OFF")
+            conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+
+def warm_pool():
+    """Open the pool's connections up front so first requests don't pay for connecting."""
+    # Fork'tan önce açılmış bağlantılar worker'lar arasında paylaşılmamalı
+    engine.dispose(close=False)
+    size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    connections = [engine.connect() for _ in range(max(size, 1))]
+    try:
+        for connection in connections:
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections) 
\ No newline at end of file
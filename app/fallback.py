@@ -0,0 +1,174 @@
+"""
+Topic-aware fallback question templates.
+
+When no LLM is available and the question bank has too few matches, quizzes
+are filled from a versioned corpus of ready questions (app/data/
+fallback_templates.json). The corpus is loaded once at startup into a compact
+index: every topic keyword, Turkish case-folded and reduced to ASCII so that
+"COĞRAFYA", "Cografya" and "coğrafya" share one key, maps to the topics it
+belongs to. A lookup is one dict probe per query token (plus a few shorter
+prefixes to get past Turkish suffixes), independent of the corpus size.
+"""
+import json
+import os
+import random
+from collections import defaultdict
+from itertools import permutations
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.llm_parser import OPTION_COUNT, normalize_text, validate_question
+from app.question_bank import fold, tokenize
+
+FALLBACK_TEMPLATES_PATH = os.getenv(
+    "FALLBACK_TEMPLATES_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "fallback_templates.json")
+)
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+# Ekleri atmak için sorgu kelimesi en fazla bu uzunluğa kadar kısaltılır ("tarihi" -> "tarih")
+MIN_STEM_LENGTH = 4
+TITLE_WEIGHT = 2
+
+_ASCII = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+# Ünsüz yumuşaması: "matematik" -> "matematiği" ile de eşleşsin
+_SOFTENING = {"k": "g", "p": "b", "t": "d"}
+# Şık sıraları bir kez hesaplanır; her soru için tek rastgele seçim yeterli
+_OPTION_ORDERS = tuple(permutations(range(OPTION_COUNT)))
+
+
+def topic_key(token: str) -> str:
+    """Turkish case-fold a token and reduce it to ASCII letters."""
+    return fold(token).translate(_ASCII)
+
+
+class TemplateTopic:
+    __slots__ = ("topic_id", "category", "by_difficulty")
+
+    def __init__(self, topic_id: str, category: Optional[str], by_difficulty: Dict[str, Tuple[Tuple[dict, str], ...]]):
+        self.topic_id = topic_id
+        self.category = category
+        self.by_difficulty = by_difficulty
+
+    def ordered(self, difficulty: Optional[str]) -> List[Tuple[Tuple[dict, str], ...]]:
+        """Question groups, the requested difficulty first and then the nearest ones."""
+        target = DIFFICULTIES.index(difficulty) if difficulty in DIFFICULTIES else 1
+        groups = sorted(self.by_difficulty.items(), key=lambda item: abs(DIFFICULTIES.index(item[0]) - target))
+        return [questions for _, questions in groups]
+
+
+class FallbackTemplates:
+    """Keyword index over the fallback question corpus."""
+
+    def __init__(self, path: str = FALLBACK_TEMPLATES_PATH):
+        self.path = path
+        self.version: Optional[int] = None
+        # Yeniden yüklemede konu listesi ve indeks tek atamayla birlikte değişir
+        self._state: Tuple[List[TemplateTopic], Dict[str, Tuple[int, ...]]] = ([], {})
+
+    def __len__(self) -> int:
+        return sum(len(group) for topic in self._state[0] for group in topic.by_difficulty.values())
+
+    def load(self) -> None:
+        """Read the corpus file and rebuild the index."""
+        with open(self.path, encoding="utf-8") as f:
+            corpus = json.load(f)
+
+        topics: List[TemplateTopic] = []
+        index: Dict[str, List[int]] = defaultdict(list)
+        skipped = 0
+        for topic_data in corpus["topics"]:
+            groups: Dict[str, List[Tuple[dict, str]]] = defaultdict(list)
+            for question_data in topic_data["questions"]:
+                question = validate_question(question_data)
+                if question is None:
+                    skipped += 1
+                    continue
+                difficulty = question_data.get("difficulty")
+                groups[difficulty if difficulty in DIFFICULTIES else "medium"].append(
+                    (question, normalize_text(question["text"]))
+                )
+            if not groups:
+                continue
+
+            position = len(topics)
+            topics.append(TemplateTopic(
+                topic_data["id"], topic_data.get("category"),
+                {difficulty: tuple(groups[difficulty]) for difficulty in DIFFICULTIES if groups[difficulty]}
+            ))
+            for keyword in topic_data["keywords"] + [topic_data.get("category") or ""]:
+                for token in tokenize(keyword):
+                    key = topic_key(token)
+                    keys = {key}
+                    if key[-1] in _SOFTENING:
+                        keys.add(key[:-1] + _SOFTENING[key[-1]])
+                    for variant in keys:
+                        if position not in index[variant]:
+                            index[variant].append(position)
+
+        self.version = corpus.get("version")
+        self._state = (topics, {key: tuple(positions) for key, positions in index.items()})
+
+        if skipped:
+            print(f"Fallback templates: skipped {skipped} invalid questions")
+        print(f"Fallback templates v{self.version} loaded with {len(self)} questions in {len(topics)} topics")
+
+    @staticmethod
+    def _lookup(index: Dict[str, Tuple[int, ...]], token: str) -> Tuple[int, ...]:
+        key = topic_key(token)
+        for end in range(len(key), MIN_STEM_LENGTH - 1, -1):
+            positions = index.get(key[:end])
+            if positions:
+                return positions
+        # Kısa anahtarlar ("dna", "dil") yalnızca tam eşleşir
+        return index.get(key, ())
+
+    def match(self, title: str, prompt: Optional[str] = None, category: Optional[str] = None) -> List[TemplateTopic]:
+        """Topics matching a quiz, best first."""
+        topics, index = self._state
+        scores: Dict[int, int] = defaultdict(int)
+        for text, weight in ((title, TITLE_WEIGHT), (category, TITLE_WEIGHT), (prompt, 1)):
+            for token in set(tokenize(text)):
+                for position in self._lookup(index, token):
+                    scores[position] += weight
+        ranked = sorted(scores, key=lambda position: (-scores[position], position))
+        return [topics[position] for position in ranked]
+
+    def questions_for(
+        self,
+        count: int,
+        title: str,
+        prompt: Optional[str] = None,
+        category: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        exclude_texts: Optional[Iterable[str]] = None
+    ) -> List[dict]:
+        """Return up to `count` template questions for the quiz topic, in random order."""
+        if count <= 0:
+            return []
+
+        excluded = set(normalize_text(text) for text in (exclude_texts or []))
+        questions: List[dict] = []
+        for topic in self.match(title, prompt, category):
+            for group in topic.ordered(difficulty):
+                for question, key in random.sample(group, len(group)):
+                    if key in excluded:
+                        continue
+                    excluded.add(key)
+                    questions.append(self._variant(question))
+                    if len(questions) >= count:
+                        return questions
+        return questions
+
+    @staticmethod
+    def _variant(question: dict) -> dict:
+        """Copy a question with its options shuffled, so repeated quizzes differ."""
+        order = random.choice(_OPTION_ORDERS)
+        return {
+            "text": question["text"],
+            "options": [question["options"][index] for index in order],
+            "correct": order.index(question["correct"])
+        }
+
+
+fallback_templates = FallbackTemplates()
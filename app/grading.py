@@ -0,0 +1,235 @@
+"""
+Quiz grading and buffered attempt persistence.
+
+Answer keys are loaded once per quiz into a compact bytes array and cached.
+Submissions are graded by comparing answer bytes against the key in one C-level
+pass, and graded attempts are written through a buffer that bulk-inserts them
+in the background instead of doing one ORM round-trip per submission.
+"""
+import asyncio
+import operator
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.analytics import AnalyticsDelta
+from app.database import SessionLocal
+from app.models import Attempt, Question, Quiz, QuizSnapshot
+
+# Boş veya geçersiz cevaplar bu değerle kodlanır, hiçbir anahtarla eşleşmez
+NO_ANSWER = 255
+# Aralık dışı kayıtlı doğru cevap; ne gönderilen bir cevapla ne de NO_ANSWER ile eşleşir
+INVALID_KEY = 254
+
+ANSWER_KEY_CACHE_SIZE = 1024
+ANSWER_KEY_TTL_SECONDS = 60
+ANSWER_KEY_WARMUP_SIZE = 256
+
+ATTEMPT_FLUSH_SIZE = 500
+ATTEMPT_FLUSH_INTERVAL = 0.5
+
+
+class AnswerKey:
+    """Correct option index of every question of a quiz, as bytes."""
+    __slots__ = ("quiz_id", "owner_id", "version", "question_ids", "key", "loaded_at")
+
+    def __init__(self, quiz_id: int, owner_id: int, question_ids: List[int], correct: List[int], version: int = 0):
+        self.quiz_id = quiz_id
+        self.owner_id = owner_id
+        self.version = version  # Quiz snapshot sürümü; her quiz yazımında artar
+        self.question_ids = tuple(question_ids)
+        self.key = bytes(
+            value if isinstance(value, int) and 0 <= value < INVALID_KEY else INVALID_KEY for value in correct
+        )
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.key)
+
+    def encode(self, answers: Sequence[Optional[int]]) -> bytes:
+        """Encode submitted answers, padding unanswered questions."""
+        encoded = bytes(
+            answer if answer is not None and 0 <= answer < INVALID_KEY else NO_ANSWER
+            for answer in answers
+        )
+        return encoded + bytes([NO_ANSWER]) * (len(self.key) - len(encoded))
+
+    def grade(self, answers: Sequence[Optional[int]]) -> Tuple[int, bytes]:
+        """Return (score, per-question correctness flags) for a submission."""
+        flags = bytes(map(operator.eq, self.key, self.encode(answers)))
+        return flags.count(1), flags
+
+
+def load_answer_key(db: Session, quiz_id: int) -> Optional[AnswerKey]:
+    """Load the answer key of a quiz from the database."""
+    quiz = db.execute(
+        select(Quiz.owner_id, func.coalesce(QuizSnapshot.version, 0))
+        .outerjoin(QuizSnapshot, QuizSnapshot.quiz_id == Quiz.id)
+        .where(Quiz.id == quiz_id)
+    ).first()
+    if quiz is None:
+        return None
+
+    rows = db.execute(
+        select(Question.id, Question.correct)
+        .where(Question.quiz_id == quiz_id)
+        .order_by(Question.order, Question.id)
+    ).all()
+    return AnswerKey(quiz_id, quiz[0], [row[0] for row in rows], [row[1] for row in rows], quiz[1])
+
+
+class AnswerKeyCache:
+    """Small LRU cache of answer keys with a TTL for multi-worker staleness."""
+
+    def __init__(self, max_size: int = ANSWER_KEY_CACHE_SIZE, ttl: float = ANSWER_KEY_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._keys: "OrderedDict[int, AnswerKey]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, quiz_id: int) -> Optional[AnswerKey]:
+        with self._lock:
+            key = self._keys.get(quiz_id)
+            if key is not None and time.monotonic() - key.loaded_at < self.ttl:
+                self._keys.move_to_end(quiz_id)
+                return key
+
+        key = load_answer_key(db, quiz_id)
+        if key is None:
+            self.invalidate(quiz_id)
+            return None
+
+        with self._lock:
+            self._keys[quiz_id] = key
+            self._keys.move_to_end(quiz_id)
+            while len(self._keys) > self.max_size:
+                self._keys.popitem(last=False)
+        return key
+
+    def invalidate(self, quiz_id: int) -> None:
+        with self._lock:
+            self._keys.pop(quiz_id, None)
+
+    def prime(self, db: Session, limit: int = ANSWER_KEY_WARMUP_SIZE) -> int:
+        """Preload the keys of the most recently created quizzes in two queries."""
+        quizzes = db.execute(
+            select(Quiz.id, Quiz.owner_id, func.coalesce(QuizSnapshot.version, 0))
+            .outerjoin(QuizSnapshot, QuizSnapshot.quiz_id == Quiz.id)
+            .order_by(Quiz.created_at.desc(), Quiz.id.desc())
+            .limit(min(limit, self.max_size))
+        ).all()
+        owners = {row[0]: row[1] for row in quizzes}
+        versions = {row[0]: row[2] for row in quizzes}
+        if not owners:
+            return 0
+
+        columns: Dict[int, Tuple[List[int], List[int]]] = {quiz_id: ([], []) for quiz_id in owners}
+        for quiz_id, question_id, correct in db.execute(
+            select(Question.quiz_id, Question.id, Question.correct)
+            .where(Question.quiz_id.in_(list(owners)))
+            .order_by(Question.quiz_id, Question.order, Question.id)
+        ):
+            columns[quiz_id][0].append(question_id)
+            columns[quiz_id][1].append(correct)
+
+        with self._lock:
+            # En eski quiz önce eklenir ki LRU sırası korunur
+            for quiz_id in reversed(list(owners)):
+                self._keys[quiz_id] = AnswerKey(quiz_id, owners[quiz_id], *columns[quiz_id], versions[quiz_id])
+                self._keys.move_to_end(quiz_id)
+            while len(self._keys) > self.max_size:
+                self._keys.popitem(last=False)
+        return len(owners)
+
+
+class AttemptBuffer:
+    """Collects graded attempts and bulk-inserts them in the background."""
+
+    def __init__(self, flush_size: int = ATTEMPT_FLUSH_SIZE, flush_interval: float = ATTEMPT_FLUSH_INTERVAL):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._rows: List[Dict[str, Any]] = []
+        self._delta = AnalyticsDelta()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        """Start the background flush loop on the running event loop."""
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write out whatever is still buffered."""
+        if self._task is not None:
+            # İptal etmek yerine döngünün devam eden flush'ı bitirmesi beklenir
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def add(self, key: AnswerKey, rows: List[Dict[str, Any]], flags: List[bytes]) -> None:
+        """Queue graded attempt rows and fold them into the pending analytics."""
+        self._rows.extend(rows)
+        for row, row_flags in zip(rows, flags):
+            self._delta.record(
+                key.quiz_id, key.question_ids, row["answers"], row_flags, row["score"], key.version
+            )
+        if len(self._rows) >= self.flush_size:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Insert all buffered rows; returns the number of rows written."""
+        if not self._rows:
+            return 0
+        async with self._flush_lock:
+            rows, self._rows = self._rows, []
+            delta, self._delta = self._delta, AnalyticsDelta()
+            if rows:
+                try:
+                    await run_in_threadpool(write_attempts, rows, delta)
+                except Exception:
+                    # Yazılamayan denemeler kaybolmasın, bir sonraki flush'ta tekrar denenir
+                    self._rows[:0] = rows
+                    self._delta.merge(delta)
+                    raise
+            return len(rows)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Attempt flush error: {e}")
+
+
+def write_attempts(rows: List[Dict[str, Any]], delta: AnalyticsDelta) -> None:
+    """Bulk-insert attempt rows and apply their analytics in one transaction."""
+    with SessionLocal() as db:
+        # Tamponda beklerken silinmiş quizlere ait denemeler atlanır
+        quiz_ids = set(row["quiz_id"] for row in rows)
+        existing = set(db.scalars(select(Quiz.id).where(Quiz.id.in_(quiz_ids))))
+        if existing != quiz_ids:
+            rows = [row for row in rows if row["quiz_id"] in existing]
+            delta.discard_quizzes(quiz_ids - existing)
+
+        if rows:
+            db.execute(insert(Attempt), rows)
+        delta.apply(db)
+        db.commit()
+
+
+answer_keys = AnswerKeyCache()
+attempt_buffer = AttemptBuffer()
@@ -0,0 +1,186 @@
+"""
+Idempotency-Key support for quiz creation and generation.
+
+Each (user, key) pair is claimed with a row in idempotency_keys before any
+work starts, so only one request per key ever generates a quiz, across all
+workers. The row is marked completed with the quiz id in the same transaction
+that saves the quiz. Retries that arrive while the original is still running
+wait for it (in-process through a shared future, or by polling the row when
+the original runs on another worker); retries after completion replay the
+stored quiz. Keys expire after IDEMPOTENCY_TTL_HOURS.
+"""
+import asyncio
+import hashlib
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import orjson
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import IdempotencyKey
+from app.serialization import load_quiz_payload
+
+IDEMPOTENCY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+# Bu süreden eski "pending" kayıtlar çökmüş bir worker'dan kalmış sayılır
+PENDING_TIMEOUT_SECONDS = 600
+WAIT_TIMEOUT_SECONDS = 120
+POLL_INTERVAL = 0.5
+MAX_KEY_LENGTH = 255
+
+CLAIMED = "claimed"
+PENDING = "pending"
+COMPLETED = "completed"
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used for a different request."""
+
+
+class IdempotencyKeyInProgress(Exception):
+    """The original request is still running elsewhere after the wait timeout."""
+
+
+def request_fingerprint(path: str, body: Dict[str, Any]) -> str:
+    """Hash of the request a key was first used with."""
+    return hashlib.sha256(orjson.dumps([path, body], option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def claim_key(owner_id: int, key: str, request_hash: str) -> Tuple[str, Optional[int]]:
+    """Try to claim a key; returns (CLAIMED | PENDING | COMPLETED, quiz id)."""
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        row = db.get(IdempotencyKey, (owner_id, key))
+        if row is not None and (
+            row.expires_at <= now
+            or (row.status == PENDING and row.created_at <= now - timedelta(seconds=PENDING_TIMEOUT_SECONDS))
+        ):
+            db.delete(row)
+            db.flush()
+            row = None
+
+        if row is None:
+            db.add(IdempotencyKey(
+                owner_id=owner_id,
+                key=key,
+                request_hash=request_hash,
+                status=PENDING,
+                created_at=now,
+                expires_at=now + timedelta(hours=IDEMPOTENCY_TTL_HOURS)
+            ))
+            try:
+                db.commit()
+                return CLAIMED, None
+            except IntegrityError:
+                # Aynı anda başka bir istek anahtarı aldı
+                db.rollback()
+                row = db.get(IdempotencyKey, (owner_id, key))
+                if row is None:
+                    return PENDING, None
+
+        if row.request_hash != request_hash:
+            raise IdempotencyKeyReused()
+        return row.status, row.quiz_id
+
+
+def complete_key(db: Session, owner_id: int, key: str, quiz_id: int) -> None:
+    """Record the created quiz; called in the transaction that saves it."""
+    db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.owner_id == owner_id, IdempotencyKey.key == key)
+        .values(status=COMPLETED, quiz_id=quiz_id)
+    )
+
+
+def release_key(owner_id: int, key: str) -> None:
+    """Drop a pending claim after a failure so a retry can run again."""
+    with SessionLocal() as db:
+        db.execute(delete(IdempotencyKey).where(
+            IdempotencyKey.owner_id == owner_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status == PENDING
+        ))
+        db.commit()
+
+
+def load_completed(owner_id: int, quiz_id: Optional[int]) -> Optional[dict]:
+    with SessionLocal() as db:
+        return load_quiz_payload(db, quiz_id, owner_id=owner_id) if quiz_id is not None else None
+
+
+def purge_expired_keys(db: Session) -> int:
+    """Delete expired idempotency keys."""
+    deleted = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow())).rowcount
+    db.commit()
+    return deleted
+
+
+class IdempotencyStore:
+    """Runs an operation at most once per (user, key)."""
+
+    def __init__(self, wait_timeout: float = WAIT_TIMEOUT_SECONDS, poll_interval: float = POLL_INTERVAL):
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._inflight: Dict[Tuple[int, str], Tuple[str, asyncio.Future]] = {}
+
+    async def run(
+        self,
+        owner_id: int,
+        key: str,
+        request_hash: str,
+        operation: Callable[[], Awaitable[Optional[dict]]]
+    ) -> Tuple[Optional[dict], bool]:
+        """Return (quiz payload, replayed); the payload is None if a replayed quiz was deleted."""
+        scope = (owner_id, key)
+        deadline = time.monotonic() + self.wait_timeout
+
+        while True:
+            inflight = self._inflight.get(scope)
+            if inflight is not None:
+                if inflight[0] != request_hash:
+                    raise IdempotencyKeyReused()
+                future = inflight[1]
+                try:
+                    return await asyncio.shield(future), True
+                except asyncio.CancelledError:
+                    if not future.cancelled():
+                        raise
+                except Exception:
+                    pass
+                # Asıl istek başarısız olduysa bu istek yeniden dener
+                continue
+
+            status, quiz_id = await run_in_threadpool(claim_key, owner_id, key, request_hash)
+            if status == CLAIMED:
+                break
+            if status == COMPLETED:
+                return await run_in_threadpool(load_completed, owner_id, quiz_id), True
+            if time.monotonic() > deadline:
+                raise IdempotencyKeyInProgress()
+            await asyncio.sleep(self.poll_interval)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[scope] = (request_hash, future)
+        try:
+            result = await operation()
+        except BaseException as e:
+            await run_in_threadpool(release_key, owner_id, key)
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                future.exception()  # Bekleyen yoksa "never retrieved" uyarısını önler
+            else:
+                future.cancel()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            self._inflight.pop(scope, None)
+
+
+idempotency_store = IdempotencyStore()
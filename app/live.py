@@ -0,0 +1,428 @@
+"""
+Live quiz sessions over WebSockets.
+
+The worker where the host is connected owns the session state (current
+question, answer counts, scores). Every message for participants is serialized
+once and published on the session's "out" channel; each worker fans it out to
+its local sockets through bounded per-client queues. Participant answers travel
+the other way on the "in" channel. LocalPubSub keeps everything in-process;
+RedisPubSub lets sessions span multiple workers.
+"""
+import asyncio
+import os
+import secrets
+from typing import Any, Dict, List, Optional, Set
+
+import orjson
+from fastapi import WebSocket
+
+from app.grading import INVALID_KEY, AnswerKey
+from app.serialization import dumps
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis isteğe bağlıdır, yoksa tek worker modunda çalışılır
+    aioredis = None
+
+LIVE_PUBSUB_URL = os.getenv("LIVE_PUBSUB_URL")
+
+CLIENT_QUEUE_SIZE = 32
+SESSION_TTL_SECONDS = 6 * 60 * 60
+LEADERBOARD_SIZE = 10
+
+
+class Subscription:
+    """Async iterator over messages published on a channel."""
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> bytes:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        raise NotImplementedError
+
+
+class PubSub:
+    """Minimal publish/subscribe backend interface."""
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        raise NotImplementedError
+
+    async def subscribe(self, channel: str) -> Subscription:
+        raise NotImplementedError
+
+    async def register(self, code: str) -> bool:
+        """Reserve a session code; returns False if it is already taken."""
+        raise NotImplementedError
+
+    async def unregister(self, code: str) -> None:
+        raise NotImplementedError
+
+    async def exists(self, code: str) -> bool:
+        raise NotImplementedError
+
+
+class LocalSubscription(Subscription):
+    def __init__(self, pubsub: "LocalPubSub", channel: str):
+        self._pubsub = pubsub
+        self._channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def __anext__(self) -> bytes:
+        message = await self.queue.get()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+    async def close(self) -> None:
+        subscribers = self._pubsub.channels.get(self._channel)
+        if subscribers is not None:
+            subscribers.discard(self)
+            if not subscribers:
+                del self._pubsub.channels[self._channel]
+        self.queue.put_nowait(None)
+
+
+class LocalPubSub(PubSub):
+    """In-process backend for a single worker and for tests."""
+
+    def __init__(self):
+        self.channels: Dict[str, Set[LocalSubscription]] = {}
+        self.codes: Set[str] = set()
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        for subscription in tuple(self.channels.get(channel, ())):
+            subscription.queue.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> Subscription:
+        subscription = LocalSubscription(self, channel)
+        self.channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    async def register(self, code: str) -> bool:
+        if code in self.codes:
+            return False
+        self.codes.add(code)
+        return True
+
+    async def unregister(self, code: str) -> None:
+        self.codes.discard(code)
+
+    async def exists(self, code: str) -> bool:
+        return code in self.codes
+
+
+class RedisSubscription(Subscription):
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    async def __anext__(self) -> bytes:
+        while True:
+            message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+            if message is not None:
+                return message["data"]
+
+    async def close(self) -> None:
+        await self._pubsub.aclose()
+
+
+class RedisPubSub(PubSub):
+    """Redis backend so a session can span multiple workers."""
+
+    def __init__(self, url: str):
+        if aioredis is None:
+            raise RuntimeError("redis package is required for LIVE_PUBSUB_URL")
+        self._redis = aioredis.from_url(url)
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        await self._redis.publish(channel, message)
+
+    async def subscribe(self, channel: str) -> Subscription:
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(channel)
+        return RedisSubscription(pubsub)
+
+    async def register(self, code: str) -> bool:
+        return bool(await self._redis.set(f"live:{code}", b"1", nx=True, ex=SESSION_TTL_SECONDS))
+
+    async def unregister(self, code: str) -> None:
+        await self._redis.delete(f"live:{code}")
+
+    async def exists(self, code: str) -> bool:
+        return bool(await self._redis.exists(f"live:{code}"))
+
+
+def live_answer_key(quiz: Dict[str, Any]) -> Optional[AnswerKey]:
+    """Answer key for hosting a quiz, or None if a question has no valid correct option."""
+    questions = quiz["questions"]
+    key = AnswerKey(
+        quiz["id"], quiz["owner_id"],
+        [question["id"] for question in questions],
+        [question["correct"] for question in questions]
+    )
+    # Şık sayısının dışında kalan doğru cevap da geçersiz sayılır
+    if any(value == INVALID_KEY or value >= len(question["options"]) for value, question in zip(key.key, questions)):
+        return None
+    return key
+
+
+def out_channel(code: str) -> str:
+    return f"live:{code}:out"
+
+
+def in_channel(code: str) -> str:
+    return f"live:{code}:in"
+
+
+class Client:
+    """A connected socket with a bounded outgoing queue."""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.dropped = 0
+        self._sender = asyncio.create_task(self._send_loop())
+
+    def send(self, payload: str) -> None:
+        """Queue a pre-serialized message, dropping the oldest one if the client is slow."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(payload)
+
+    async def close(self) -> None:
+        self._sender.cancel()
+        try:
+            await self._sender
+        except asyncio.CancelledError:
+            pass
+
+    async def _send_loop(self) -> None:
+        try:
+            while True:
+                payload = await self.queue.get()
+                await self.websocket.send_text(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Bağlantı koptuysa alıcı döngüsü temizliği yapar
+            pass
+
+
+class Room:
+    """Local fan-out of a session's broadcasts to this worker's sockets."""
+
+    def __init__(self, hub: "LiveHub", code: str):
+        self.hub = hub
+        self.code = code
+        self.clients: Set[Client] = set()
+        self.last_payload: Optional[str] = None
+        self._subscription: Optional[Subscription] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._subscription = await self.hub.pubsub.subscribe(out_channel(self.code))
+        self._task = asyncio.create_task(self._fan_out())
+
+    async def stop(self) -> None:
+        if self._subscription is not None:
+            await self._subscription.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _fan_out(self) -> None:
+        async for message in self._subscription:
+            # Mesaj bir kez çözülür, aynı metin tüm soketlere gönderilir
+            payload = message.decode()
+            self.last_payload = payload
+            for client in tuple(self.clients):
+                client.send(payload)
+
+
+class LiveSession:
+    """Authoritative state of a live session, kept by the host's worker."""
+
+    def __init__(self, hub: "LiveHub", code: str, quiz: Dict[str, Any], answer_key: AnswerKey, host: Client):
+        self.hub = hub
+        self.code = code
+        self.quiz_id = quiz["id"]
+        self.title = quiz["title"]
+        self.host = host
+        self.questions = [
+            {"text": question["text"], "options": question["options"]}
+            for question in quiz["questions"]
+        ]
+        self.key = answer_key.key
+        self.index = -1
+        self.accepting = False
+        self.counts: List[int] = []
+        self.answered: Set[str] = set()
+        self.participants: Dict[str, str] = {}
+        self.connected: Set[str] = set()
+        self.scores: Dict[str, int] = {}
+        self._subscription: Optional[Subscription] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._subscription = await self.hub.pubsub.subscribe(in_channel(self.code))
+        self._task = asyncio.create_task(self._consume())
+
+    async def stop(self) -> None:
+        if self._subscription is not None:
+            await self._subscription.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def broadcast(self, message: Dict[str, Any]) -> None:
+        """Serialize once and publish to every worker's room."""
+        await self.hub.pubsub.publish(out_channel(self.code), dumps(message))
+
+    def notify_host(self, message: Dict[str, Any]) -> None:
+        self.host.send(dumps(message).decode())
+
+    async def next_question(self) -> None:
+        if self.index + 1 >= len(self.questions):
+            await self.finish()
+            return
+
+        self.index += 1
+        question = self.questions[self.index]
+        self.counts = [0] * len(question["options"])
+        self.answered = set()
+        self.accepting = True
+        message = {
+            "type": "question",
+            "index": self.index,
+            "total": len(self.questions),
+            "text": question["text"],
+            "options": question["options"],
+        }
+        await self.broadcast(message)
+        self.notify_host(message)
+
+    async def reveal(self) -> None:
+        if self.index < 0:
+            return
+        self.accepting = False
+        message = {
+            "type": "results",
+            "index": self.index,
+            "correct": self.key[self.index],
+            "counts": self.counts,
+            "answered": len(self.answered),
+            "leaderboard": self.leaderboard(),
+        }
+        await self.broadcast(message)
+        self.notify_host(message)
+
+    async def finish(self) -> None:
+        self.accepting = False
+        message = {"type": "finished", "leaderboard": self.leaderboard()}
+        await self.broadcast(message)
+        self.notify_host(message)
+
+    def leaderboard(self) -> List[Dict[str, Any]]:
+        ranked = sorted(self.scores.items(), key=lambda item: item[1], reverse=True)[:LEADERBOARD_SIZE]
+        return [{"name": self.participants.get(pid, "?"), "score": score} for pid, score in ranked]
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        """Apply a participant event in O(1)."""
+        pid = event.get("pid")
+        if event.get("type") == "join":
+            self.participants[pid] = str(event.get("name", ""))[:50]
+            self.connected.add(pid)
+            self.scores.setdefault(pid, 0)
+            self.notify_host({"type": "participants", "count": len(self.connected)})
+        elif event.get("type") == "answer":
+            option = event.get("option")
+            if (
+                not self.accepting or event.get("index") != self.index or pid in self.answered
+                or not isinstance(option, int) or not 0 <= option < len(self.counts)
+            ):
+                return
+            self.answered.add(pid)
+            self.counts[option] += 1
+            if option == self.key[self.index]:
+                self.scores[pid] = self.scores.get(pid, 0) + 1
+            self.notify_host({"type": "answers", "index": self.index, "answered": len(self.answered)})
+        elif event.get("type") == "leave":
+            self.connected.discard(pid)
+            self.notify_host({"type": "participants", "count": len(self.connected)})
+
+    async def _consume(self) -> None:
+        async for message in self._subscription:
+            try:
+                self.handle_event(orjson.loads(message))
+            except orjson.JSONDecodeError:
+                continue
+
+
+class LiveHub:
+    """Per-worker registry of owned sessions and local rooms."""
+
+    def __init__(self, pubsub: PubSub):
+        self.pubsub = pubsub
+        self.sessions: Dict[str, LiveSession] = {}
+        self.rooms: Dict[str, Room] = {}
+        self._lock = asyncio.Lock()
+
+    async def create_session(self, quiz: Dict[str, Any], answer_key: AnswerKey, host: Client) -> LiveSession:
+        code = secrets.token_hex(3).upper()
+        while not await self.pubsub.register(code):
+            code = secrets.token_hex(3).upper()
+        session = LiveSession(self, code, quiz, answer_key, host)
+        self.sessions[code] = session
+        await session.start()
+        return session
+
+    async def close_session(self, session: LiveSession) -> None:
+        self.sessions.pop(session.code, None)
+        await self.pubsub.unregister(session.code)
+        await session.broadcast({"type": "closed"})
+        await session.stop()
+
+    async def join_room(self, code: str, client: Client) -> Room:
+        async with self._lock:
+            room = self.rooms.get(code)
+            if room is None:
+                room = Room(self, code)
+                await room.start()
+                self.rooms[code] = room
+            room.clients.add(client)
+            # Geç katılanlar son yayını (ör. aktif soru) hemen alır
+            if room.last_payload is not None:
+                client.send(room.last_payload)
+            return room
+
+    async def leave_room(self, room: Room, client: Client) -> None:
+        async with self._lock:
+            room.clients.discard(client)
+            if not room.clients and self.rooms.get(room.code) is room:
+                del self.rooms[room.code]
+                await room.stop()
+
+    async def session_exists(self, code: str) -> bool:
+        return await self.pubsub.exists(code)
+
+    async def send_event(self, code: str, event: Dict[str, Any]) -> None:
+        """Forward a participant event to the worker that owns the session."""
+        await self.pubsub.publish(in_channel(code), dumps(event))
+
+
+def create_pubsub() -> PubSub:
+    if LIVE_PUBSUB_URL:
+        return RedisPubSub(LIVE_PUBSUB_URL)
+    return LocalPubSub()
+
+
+live_hub = LiveHub(create_pubsub())
@@ -0,0 +1,165 @@
+"""
+Tolerant, incremental parser for quiz questions in LLM output.
+
+The parser is fed the reply chunk by chunk and yields every complete question
+object as soon as its closing brace arrives. Stray prose, markdown fences and
+a truncated final question are skipped instead of failing the whole reply.
+"""
+import json
+import re
+from typing import Any, Iterable, List, Optional
+
+OPTION_COUNT = 4
+OPTION_LETTERS = "ABCD"
+
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_OPTION_LABEL = re.compile(r"^\s*[A-Da-d]\s*[\)\.:\-]\s+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize question text for duplicate detection."""
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def _loads(fragment: str) -> Optional[Any]:
+    """Decode a JSON fragment, repairing common defects."""
+    for candidate in (fragment, _TRAILING_COMMA.sub(r"\1", fragment)):
+        try:
+            return json.loads(candidate, strict=False)
+        except ValueError:
+            continue
+    return None
+
+
+def _repair_options(options: Any) -> Optional[List[str]]:
+    """Coerce options into a list of clean strings."""
+    if isinstance(options, dict):
+        options = [options[key] for key in sorted(options)]
+    if not isinstance(options, list):
+        return None
+
+    options = [str(option).strip() for option in options if option is not None]
+    # "A) ..." gibi etiketleri sadece tüm seçeneklerde varsa temizle
+    if options and all(_OPTION_LABEL.match(option) for option in options):
+        options = [_OPTION_LABEL.sub("", option, count=1) for option in options]
+    return options
+
+
+def _repair_correct(correct: Any, options: List[str]) -> Optional[int]:
+    """Coerce the correct answer into an option index."""
+    if isinstance(correct, bool):
+        return None
+    if isinstance(correct, int):
+        return correct
+    if isinstance(correct, float) and correct.is_integer():
+        return int(correct)
+    if isinstance(correct, str):
+        value = correct.strip()
+        if value.isdigit():
+            return int(value)
+        if len(value) == 1 and value.upper() in OPTION_LETTERS:
+            return OPTION_LETTERS.index(value.upper())
+        for index, option in enumerate(options):
+            if option == value:
+                return index
+    return None
+
+
+def validate_question(data: Any) -> Optional[dict]:
+    """Return a repaired question dict, or None if it cannot be used."""
+    if not isinstance(data, dict):
+        return None
+
+    text = data.get("text") or data.get("question")
+    if not isinstance(text, str) or not text.strip():
+        return None
+
+    options = _repair_options(data.get("options"))
+    if options is None or len(options) != OPTION_COUNT:
+        return None
+    if any(not option for option in options) or len(set(options)) != OPTION_COUNT:
+        return None
+
+    correct = _repair_correct(data.get("correct", data.get("answer")), options)
+    if correct is None or not 0 <= correct < OPTION_COUNT:
+        return None
+
+    return {"text": text.strip(), "options": options, "correct": correct}
+
+
+class QuestionStreamParser:
+    """Incrementally extract valid question objects from streamed LLM output."""
+
+    def __init__(self, seen_texts: Optional[Iterable[str]] = None):
+        self.questions: List[dict] = []
+        self.rejected = 0
+        self._seen = set(normalize_text(text) for text in (seen_texts or []))
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[int] = []
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> List[dict]:
+        """Consume a chunk of output and return questions completed by it."""
+        self._buffer += chunk
+        completed = []
+        buffer = self._buffer
+
+        for pos in range(self._pos, len(buffer)):
+            char = buffer[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"' and self._stack:
+                # Nesne dışındaki düzyazıda eşlenmemiş tırnak olabilir; string durumu sadece nesne içinde izlenir
+                self._in_string = True
+            elif char == "{":
+                self._stack.append(pos)
+            elif char == "}" and self._stack:
+                start = self._stack.pop()
+                question = self._accept(buffer[start:pos + 1])
+                if question is not None:
+                    completed.append(question)
+
+        self._pos = len(buffer)
+        if not self._stack:
+            # Tamamlanan nesneler tekrar taranmaz, buffer'ı kısa tut
+            self._buffer = ""
+            self._pos = 0
+        return completed
+
+    def _accept(self, fragment: str) -> Optional[dict]:
+        if '"options"' not in fragment:
+            return None
+
+        data = _loads(fragment)
+        if isinstance(data, dict) and "text" not in data and "question" not in data:
+            # {"questions": [...]} gibi kapsayıcı nesneler
+            return None
+
+        question = validate_question(data)
+        if question is None:
+            self.rejected += 1
+            return None
+
+        key = normalize_text(question["text"])
+        if key in self._seen:
+            self.rejected += 1
+            return None
+
+        self._seen.add(key)
+        self.questions.append(question)
+        return question
+
+
+def parse_questions(content: str, seen_texts: Optional[Iterable[str]] = None) -> List[dict]:
+    """Extract all valid questions from a complete LLM reply."""
+    parser = QuestionStreamParser(seen_texts)
+    parser.feed(content)
+    return parser.questions
@@ -0,0 +1,418 @@
+"""
+LLM provider routing for quiz generation.
+
+Every provider/model pair keeps a rolling window of call latencies and errors.
+A request is routed to a primary tier chosen from its question count and
+difficulty (small or easy quizzes go to the cheaper, faster model), with
+another tier as backup. If the primary has not answered by its own p95
+latency, counted from when the call actually starts running, the same request
+is sent to the backup as well (a hedged request) and whichever finishes first
+wins. No hedge is sent while every worker is busy, since it would only queue
+behind the primary. A failing primary fails over to the backup immediately.
+LocalProvider is a deterministic offline stand-in.
+"""
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+import orjson
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain.schema import HumanMessage
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")  # gemini veya local (çevrimdışı)
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_FAST_MODEL = os.getenv("GEMINI_FAST_MODEL", "gemini-1.5-flash-8b")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+GEMINI_STRONG_MODEL = os.getenv("GEMINI_STRONG_MODEL", "gemini-1.5-pro")
+
+FAST = "fast"
+DEFAULT = "default"
+STRONG = "strong"
+
+# Yönlendirme eşikleri
+SMALL_QUIZ_QUESTIONS = 5
+LARGE_QUIZ_QUESTIONS = 15
+
+PROFILE_WINDOW = 100
+MIN_HEDGE_SAMPLES = 20
+UNHEALTHY_ERROR_RATE = 0.5
+MIN_HEALTH_SAMPLES = 5
+# Sağlıksız sağlayıcı bu süre sonra tekrar birincil olarak denenir
+UNHEALTHY_COOLDOWN_SECONDS = 30.0
+HEDGE_WORKERS = 32
+
+
+class GenerationRequest:
+    """What a provider needs to produce one batch of questions."""
+    __slots__ = ("content", "title", "prompt", "question_count", "difficulty", "category")
+
+    def __init__(
+        self,
+        content: str,
+        title: str,
+        prompt: str,
+        question_count: int,
+        difficulty: str,
+        category: Optional[str] = None
+    ):
+        self.content = content
+        self.title = title
+        self.prompt = prompt
+        self.question_count = question_count
+        self.difficulty = difficulty
+        self.category = category
+
+
+class TokenUsage:
+    """Token counts reported by a provider while streaming."""
+    __slots__ = ("prompt_tokens", "completion_tokens")
+
+    def __init__(self, prompt_tokens: int, completion_tokens: int):
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+
+class Completion:
+    """Text chunks returned by a provider, with the error that cut it short if any."""
+    __slots__ = (
+        "provider", "model", "chunks", "error", "latency", "hedged",
+        "prompt_tokens", "completion_tokens"
+    )
+
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+        self.chunks: List[str] = []
+        self.error: Optional[Exception] = None
+        self.latency = 0.0
+        self.hedged = False
+        # Sağlayıcı token sayısı bildirmezse None kalır
+        self.prompt_tokens: Optional[int] = None
+        self.completion_tokens: Optional[int] = None
+
+    def add_usage(self, usage: TokenUsage) -> None:
+        self.prompt_tokens = (self.prompt_tokens or 0) + usage.prompt_tokens
+        self.completion_tokens = (self.completion_tokens or 0) + usage.completion_tokens
+
+
+class Provider:
+    """A model that streams generation output as text chunks."""
+    name = "provider"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}:{self.model}"
+
+    def stream(self, request: GenerationRequest) -> Iterator[Union[str, TokenUsage]]:
+        """Yield text chunks, and TokenUsage items if the provider reports usage."""
+        raise NotImplementedError
+
+    def warm_up(self) -> None:
+        """Create clients ahead of the first request."""
+
+
+class GeminiProvider(Provider):
+    name = "gemini"
+
+    def __init__(self, model: str, api_key: str, temperature: float = 0.7):
+        super().__init__(model)
+        self.api_key = api_key
+        self.temperature = temperature
+        self._llm = None
+        self._lock = threading.Lock()
+
+    def get_llm(self) -> ChatGoogleGenerativeAI:
+        """Get the shared LangChain Gemini LLM instance"""
+        if self._llm is None:
+            with self._lock:
+                if self._llm is None:
+                    self._llm = ChatGoogleGenerativeAI(
+                        model=self.model,
+                        google_api_key=self.api_key,
+                        temperature=self.temperature
+                    )
+        return self._llm
+
+    def warm_up(self) -> None:
+        self.get_llm()
+
+    def stream(self, request: GenerationRequest) -> Iterator[Union[str, TokenUsage]]:
+        for chunk in self.get_llm().stream([HumanMessage(content=request.content)]):
+            if isinstance(chunk.content, str):
+                yield chunk.content
+            usage = getattr(chunk, "usage_metadata", None)
+            if usage:
+                yield TokenUsage(usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
+
+class LocalProvider(Provider):
+    """Deterministic offline provider: same request, same questions."""
+    name = "local"
+
+    def __init__(self, model: str = "deterministic", delay: float = 0.0, chunk_size: int = 256):
+        super().__init__(model)
+        self.delay = delay
+        self.chunk_size = chunk_size
+
+    def build_questions(self, request: GenerationRequest) -> List[dict]:
+        seed = hashlib.sha256(request.content.encode()).digest()
+        rng = random.Random(seed)
+        topic = request.title.strip() or "Genel"
+        questions = []
+        for index in range(request.question_count):
+            options = [f"{topic} - seçenek {index + 1}.{option + 1}" for option in range(4)]
+            rng.shuffle(options)
+            questions.append({
+                "text": f"{topic} ({request.difficulty}) konusunda {index + 1}. soru: hangisi doğrudur?",
+                "options": options,
+                "correct": rng.randrange(4)
+            })
+        return questions
+
+    def stream(self, request: GenerationRequest) -> Iterator[str]:
+        payload = orjson.dumps({"questions": self.build_questions(request)}).decode()
+        chunks = [payload[i:i + self.chunk_size] for i in range(0, len(payload), self.chunk_size)]
+        for chunk in chunks:
+            if self.delay:
+                time.sleep(self.delay / len(chunks))
+            yield chunk
+
+
+class LatencyProfile:
+    """Rolling latency and error window of one provider/model."""
+
+    def __init__(self, window: int = PROFILE_WINDOW):
+        self.latencies: deque = deque(maxlen=window)
+        self.outcomes: deque = deque(maxlen=window)
+        self.last_error_at = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency: Optional[float], ok: bool) -> None:
+        with self._lock:
+            self.outcomes.append(ok)
+            if not ok:
+                self.last_error_at = time.monotonic()
+            if ok and latency is not None:
+                self.latencies.append(latency)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        with self._lock:
+            values = sorted(self.latencies)
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(len(values) * fraction))]
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            outcomes = list(self.outcomes)
+        return outcomes.count(False) / len(outcomes) if outcomes else 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return (
+            len(self.outcomes) < MIN_HEALTH_SAMPLES
+            or self.error_rate < UNHEALTHY_ERROR_RATE
+            or time.monotonic() - self.last_error_at > UNHEALTHY_COOLDOWN_SECONDS
+        )
+
+    def hedge_delay(self) -> Optional[float]:
+        """Wait this long for the primary before hedging; None until enough samples."""
+        if len(self.latencies) < MIN_HEDGE_SAMPLES:
+            return None
+        return self.percentile(0.95)
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "samples": len(self.outcomes),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "error_rate": self.error_rate,
+        }
+
+
+def choose_tiers(question_count: int, difficulty: str) -> List[str]:
+    """Primary and backup tiers for a request."""
+    if difficulty == "easy" or question_count <= SMALL_QUIZ_QUESTIONS:
+        return [FAST, DEFAULT]
+    if difficulty == "hard" and question_count < LARGE_QUIZ_QUESTIONS:
+        return [STRONG, DEFAULT]
+    return [DEFAULT, FAST]
+
+
+class LLMRouter:
+    """Routes generation requests across provider tiers with hedging and failover."""
+
+    def __init__(self, tiers: Optional[Dict[str, Provider]] = None, workers: int = HEDGE_WORKERS):
+        self.tiers: Dict[str, Provider] = {}
+        self.profiles: Dict[str, LatencyProfile] = {}
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm")
+        # Kuyrukta bekleyen ve çalışan çağrılar
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        self.set_providers(tiers or {})
+
+    @property
+    def available(self) -> bool:
+        return bool(self.tiers)
+
+    def set_providers(self, tiers: Dict[str, Provider]) -> None:
+        """Replace the tier -> provider mapping (tiers missing from it fall back to DEFAULT)."""
+        self.tiers = dict(tiers)
+        for provider in self.tiers.values():
+            self.profiles.setdefault(provider.key, LatencyProfile())
+
+    def warm_up(self) -> bool:
+        for provider in self.tiers.values():
+            provider.warm_up()
+        return self.available
+
+    def candidates(self, question_count: int, difficulty: str) -> List[Provider]:
+        """Distinct providers to try, healthy ones first."""
+        providers: List[Provider] = []
+        for tier in choose_tiers(question_count, difficulty):
+            provider = self.tiers.get(tier) or self.tiers.get(DEFAULT)
+            if provider is not None and provider not in providers:
+                providers.append(provider)
+        # Hata oranı yüksek sağlayıcılar sona alınır
+        return sorted(providers, key=lambda provider: not self.profiles[provider.key].healthy)
+
+    def _submit(
+        self,
+        provider: Provider,
+        request: GenerationRequest,
+        cancelled: threading.Event,
+        started: Optional[threading.Event] = None
+    ) -> Future:
+        with self._in_flight_lock:
+            self._in_flight += 1
+        return self._executor.submit(self._call, provider, request, cancelled, started or threading.Event())
+
+    def _has_free_worker(self) -> bool:
+        with self._in_flight_lock:
+            return self._in_flight < self.workers
+
+    def _call(
+        self,
+        provider: Provider,
+        request: GenerationRequest,
+        cancelled: threading.Event,
+        started: threading.Event
+    ) -> Completion:
+        started.set()
+        completion = Completion(provider.name, provider.model)
+        start = time.perf_counter()
+        try:
+            for chunk in provider.stream(request):
+                if isinstance(chunk, TokenUsage):
+                    completion.add_usage(chunk)
+                    continue
+                completion.chunks.append(chunk)
+                if cancelled.is_set():
+                    # Yarışı kaybeden istek profili bozmasın diye kaydedilmez
+                    completion.latency = time.perf_counter() - start
+                    return completion
+        except Exception as e:
+            completion.error = e
+        finally:
+            with self._in_flight_lock:
+                self._in_flight -= 1
+        completion.latency = time.perf_counter() - start
+        self.profiles[provider.key].record(completion.latency, completion.error is None)
+        return completion
+
+    def complete(
+        self,
+        request: GenerationRequest,
+        on_usage: Optional[Callable[[Completion, str], None]] = None
+    ) -> Completion:
+        """Run a request on the routed providers and return the first usable completion.
+
+        on_usage is called with every call made for the request and its prompt,
+        including failed attempts and hedges that lost the race (those still
+        running are reported from the worker once they stop).
+        """
+        providers = self.candidates(request.question_count, request.difficulty)
+        if not providers:
+            raise RuntimeError("No LLM provider is configured")
+
+        primary = providers[0]
+        cancelled = threading.Event()
+        started = threading.Event()
+        pending = {self._submit(primary, request, cancelled, started)}
+        backups = providers[1:]
+        delay = self.profiles[primary.key].hedge_delay()
+        deadline: Optional[float] = None
+        result: Optional[Completion] = None
+        finished: List[Completion] = []
+        hedged = False
+
+        while pending:
+            timeout = None
+            if backups and not hedged and delay is not None:
+                if deadline is None:
+                    # Kuyrukta geçen süre sayılmaz: saat, çağrı bir worker'da başlayınca işler
+                    started.wait()
+                    deadline = time.perf_counter() + delay
+                timeout = max(0.0, deadline - time.perf_counter())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                if not self._has_free_worker():
+                    # Boş worker yoksa yedek istek de kuyrukta bekler; hedge yapılmaz
+                    delay = None
+                    continue
+                # Birincil sağlayıcı p95 süresini aştı: aynı istek yedeğe de gönderilir
+                hedged = True
+                pending.add(self._submit(backups.pop(0), request, cancelled))
+                continue
+
+            for future in done:
+                completion = future.result()
+                finished.append(completion)
+                if result is not None and result.error is None:
+                    continue
+                if completion.error is None or result is None or len(completion.chunks) > len(result.chunks):
+                    result = completion
+            if result is not None and result.error is None:
+                break
+            if backups and not pending:
+                # Hata veren birincil için beklemeden yedeğe geçilir
+                hedged = True
+                pending.add(self._submit(backups.pop(0), request, cancelled))
+
+        cancelled.set()
+        result.hedged = hedged
+        if on_usage is not None:
+            # Yarışı kaybeden çağrılar da faturalanır; iptal edilenler bir sonraki parçada durur
+            for completion in finished:
+                on_usage(completion, request.content)
+            for future in pending:
+                future.add_done_callback(lambda future: on_usage(future.result(), request.content))
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        return {key: profile.summary() for key, profile in self.profiles.items()}
+
+
+def create_router() -> LLMRouter:
+    if LLM_PROVIDER == "local":
+        return LLMRouter({DEFAULT: LocalProvider()})
+    if not GEMINI_API_KEY:
+        return LLMRouter()
+    return LLMRouter({
+        FAST: GeminiProvider(GEMINI_FAST_MODEL, GEMINI_API_KEY),
+        DEFAULT: GeminiProvider(GEMINI_MODEL, GEMINI_API_KEY),
+        STRONG: GeminiProvider(GEMINI_STRONG_MODEL, GEMINI_API_KEY),
+    })
+
+
+llm_router = create_router()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, JSON, Float, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -32,13 +32,14 @@ class Quiz(Base):
 
     # Relationships
     owner = relationship("User", back_populates="quizzes")
-    questions = relationship("Question", back_populates="quiz", cascade="all, delete-orphan")
+    # Soruları (ve quiz'e bağlı diğer kayıtları) veritabanı ON DELETE CASCADE ile siler
+    questions = relationship("Question", back_populates="quiz", cascade="all, delete-orphan", passive_deletes=True)
 
 class Question(Base):
     __tablename__ = "questions"
 
     id = Column(Integer, primary_key=True, index=True)
-    quiz_id = Column(Integer, ForeignKey("quizzes.id"), nullable=False)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False, index=True)
     text = Column(Text, nullable=False)
     options = Column(JSON, nullable=False)  # Array of strings
     correct = Column(Integer, nullable=False)  # Index of correct answer
@@ -47,4 +48,106 @@ class Question(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
-    quiz = relationship("Quiz", back_populates="questions") 
\ No newline at end of file
+    quiz = relationship("Quiz", back_populates="questions") 
+
+
+class Attempt(Base):
+    __tablename__ = "attempts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    participant = Column(String(100), nullable=True)  # Toplu gönderimlerde öğrenci adı
+    answers = Column(JSON, nullable=False)  # Array of selected option indexes (null = boş)
+    score = Column(Integer, nullable=False)
+    total = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class QuizStats(Base):
+    __tablename__ = "quiz_stats"
+
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Integer, nullable=False, default=0)
+    total_sum = Column(Integer, nullable=False, default=0)  # Yüzde hesabı için soru sayıları toplamı
+
+class QuizScoreStats(Base):
+    __tablename__ = "quiz_score_stats"
+
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class QuestionStats(Base):
+    __tablename__ = "question_stats"
+
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)
+
+class QuestionOptionStats(Base):
+    __tablename__ = "question_option_stats"
+
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True)
+    option_index = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)  # Token'ın kendisi değil SHA-256 özeti saklanır
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    session_id = Column(String(32), nullable=False, index=True)  # Döndürülen token'lar aynı oturumu paylaşır
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class RevokedSession(Base):
+    __tablename__ = "revoked_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String(32), nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False)  # Oturumun son access token'ı bu zamana kadar geçerli olabilir
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)  # Aynı anahtarla farklı istek gönderilmesini yakalamak için
+    status = Column(String(20), nullable=False)  # pending, completed
+    quiz_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class GenerationLog(Base):
+    __tablename__ = "generation_log"
+    __table_args__ = (Index("ix_generation_log_user_created", "user_id", "created_at"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    quiz_id = Column(Integer, nullable=True)  # Quiz silinse de maliyet kaydı korunur
+    model = Column(String(100), nullable=True)
+    question_count = Column(Integer, nullable=False)
+    llm_calls = Column(Integer, nullable=False, default=0)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    estimated = Column(Boolean, nullable=False, default=False)  # Token sayıları yerel tahminden geldiyse
+    latency_ms = Column(Integer, nullable=False, default=0)
+    fallback_used = Column(Boolean, nullable=False, default=False)
+    hedged = Column(Boolean, nullable=False, default=False)
+    cost_usd = Column(Float, nullable=False, default=0.0)
+    created_at = Column(DateTime, nullable=False)
+
+class QuizSnapshot(Base):
+    __tablename__ = "quiz_snapshots"
+
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Yetki kontrolü join gerektirmesin diye
+    version = Column(Integer, nullable=False, default=1)
+    document = Column(LargeBinary, nullable=False)  # Yanıt gövdesi, JSON olarak serileştirilmiş
+    updated_at = Column(DateTime, nullable=False)
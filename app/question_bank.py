@@ -0,0 +1,263 @@
+"""
+Question bank over a user's own existing questions.
+
+Each user's questions are indexed by topic tokens (question text, quiz title
+and category) in a TF-IDF inverted index that only ever holds that user's
+questions, so one user's questions are never offered to another. Indexes are
+built on the first search and kept in a small LRU cache; the quiz write paths
+update the owner's cached index in place, and a TTL bounds how stale it can
+get when another worker wrote the quiz.
+"""
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.llm_parser import normalize_text, validate_question
+from app.models import Quiz, Question
+
+# AI olmadan üretilen yer tutucu sorular bankaya alınmaz
+PLACEHOLDER_OPTIONS = ["Seçenek A", "Seçenek B", "Seçenek C", "Seçenek D"]
+
+STOPWORDS = {
+    "ve", "ile", "bir", "bu", "şu", "da", "de", "mi", "mı", "mu", "mü", "için",
+    "hangi", "hangisi", "nedir", "nelerdir", "kaç", "ne", "olan", "olarak",
+    "gibi", "en", "çok", "daha", "veya", "ya", "ki", "soru", "sorular", "quiz",
+    "konusu", "konu", "ilgili", "seviyesinde", "the", "of", "and", "what", "which",
+}
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Difficulty/category eşleşmesinde uygulanan skor çarpanları
+DIFFICULTY_BOOST = 1.5
+CATEGORY_BOOST = 2.0
+
+QUESTION_BANK_CACHE_SIZE = 64
+QUESTION_BANK_TTL_SECONDS = 60
+
+
+def fold(text: str) -> str:
+    """Lowercase text with Turkish dotted/dotless i handled correctly."""
+    return text.replace("İ", "i").replace("I", "ı").lower()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into folded, stopword-free tokens."""
+    if not text:
+        return []
+    return [
+        token for token in _TOKEN.findall(fold(text))
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+class BankEntry:
+    __slots__ = ("question_id", "quiz_id", "question", "category", "difficulty", "tokens", "length")
+
+    def __init__(self, question_id: int, quiz_id: int, question: dict,
+                 category: Optional[str], difficulty: Optional[str], tokens: Counter):
+        self.question_id = question_id
+        self.quiz_id = quiz_id
+        self.question = question
+        self.category = category
+        self.difficulty = difficulty
+        self.tokens = tuple(tokens)
+        self.length = sum(tokens.values())
+
+
+class QuestionBank:
+    """TF-IDF inverted index of one user's validated questions."""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._entries: Dict[int, BankEntry] = {}
+        self._by_quiz: Dict[int, List[int]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def load(cls, db: Session, owner_id: int) -> "QuestionBank":
+        """Build the index from the questions of one user's quizzes."""
+        bank = cls()
+        rows = db.execute(
+            select(
+                Question.id, Question.quiz_id, Question.text, Question.options, Question.correct,
+                Quiz.title, Quiz.category, Quiz.difficulty
+            ).join(Quiz, Quiz.id == Question.quiz_id).where(Quiz.owner_id == owner_id)
+        )
+        for row in rows:
+            bank._add(*row)
+        return bank
+
+    def add_quiz(self, quiz: dict) -> None:
+        """Index (or re-index) a quiz payload with its questions."""
+        with self._lock:
+            self._remove(quiz["id"])
+            for question in quiz.get("questions", []):
+                self._add(
+                    question["id"], quiz["id"], question["text"], question["options"],
+                    question["correct"], quiz["title"], quiz["category"], quiz["difficulty"]
+                )
+
+    def remove_quiz(self, quiz_id: int) -> None:
+        """Drop all questions of a quiz from the index."""
+        with self._lock:
+            self._remove(quiz_id)
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        category: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        exclude_texts: Optional[Iterable[str]] = None
+    ) -> List[dict]:
+        """Return up to `limit` best matching questions for a topic query."""
+        query_tokens = set(tokenize(query)) | set(tokenize(category))
+        if not query_tokens or limit <= 0:
+            return []
+
+        category_key = fold(category) if category else None
+        excluded = set(normalize_text(text) for text in (exclude_texts or []))
+
+        with self._lock:
+            total = len(self._entries)
+            scores: Dict[int, float] = defaultdict(float)
+            for token in query_tokens:
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+                idf = math.log(1 + total / len(postings))
+                for question_id, tf in postings.items():
+                    scores[question_id] += idf * tf / self._entries[question_id].length
+
+            results = []
+            for question_id, score in scores.items():
+                entry = self._entries[question_id]
+                if difficulty and entry.difficulty == difficulty:
+                    score *= DIFFICULTY_BOOST
+                if category_key and entry.category and fold(entry.category) == category_key:
+                    score *= CATEGORY_BOOST
+                results.append((score, question_id))
+
+            results.sort(reverse=True)
+
+            questions = []
+            for _, question_id in results:
+                question = self._entries[question_id].question
+                key = normalize_text(question["text"])
+                if key in excluded:
+                    continue
+                excluded.add(key)
+                questions.append(dict(question, options=list(question["options"])))
+                if len(questions) >= limit:
+                    break
+
+        return questions
+
+    def _add(self, question_id, quiz_id, text, options, correct, title, category, difficulty) -> None:
+        question = validate_question({"text": text, "options": options, "correct": correct})
+        if question is None or question["options"] == PLACEHOLDER_OPTIONS:
+            return
+
+        tokens = tokenize(text) + tokenize(title) + tokenize(category)
+        if not tokens:
+            return
+
+        counts = Counter(tokens)
+        for token, tf in counts.items():
+            self._postings[token][question_id] = tf
+        self._entries[question_id] = BankEntry(
+            question_id, quiz_id, question, category, difficulty, counts
+        )
+        self._by_quiz[quiz_id].append(question_id)
+
+    def _remove(self, quiz_id: int) -> None:
+        for question_id in self._by_quiz.pop(quiz_id, []):
+            entry = self._entries.pop(question_id, None)
+            if entry is None:
+                continue
+            for token in entry.tokens:
+                postings = self._postings.get(token)
+                if postings is not None:
+                    postings.pop(question_id, None)
+                    if not postings:
+                        del self._postings[token]
+
+
+class QuestionBankCache:
+    """Small LRU cache of per-user question banks with a TTL for multi-worker staleness."""
+
+    def __init__(self, max_size: int = QUESTION_BANK_CACHE_SIZE, ttl: float = QUESTION_BANK_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._banks: "OrderedDict[int, QuestionBank]" = OrderedDict()
+        # Yüklenmekte olan bankalar; yükleme sırasında yazılan quiz varsa True olur
+        self._loading: Dict[int, bool] = {}
+        self._lock = threading.Lock()
+
+    def get(self, owner_id: int) -> QuestionBank:
+        with self._lock:
+            bank = self._banks.get(owner_id)
+            if bank is not None and time.monotonic() - bank.loaded_at < self.ttl:
+                self._banks.move_to_end(owner_id)
+                return bank
+            self._loading[owner_id] = False
+
+        # Kısa ömürlü oturum: indeks kurulduktan sonra bağlantı tutulmaz
+        with SessionLocal() as db:
+            bank = QuestionBank.load(db, owner_id)
+
+        with self._lock:
+            if self._loading.pop(owner_id, True):
+                # Yükleme sürerken yazılan quiz indekste eksik olabilir; önbelleğe alınmaz
+                return bank
+            self._banks[owner_id] = bank
+            self._banks.move_to_end(owner_id)
+            while len(self._banks) > self.max_size:
+                self._banks.popitem(last=False)
+        return bank
+
+    def _written(self, owner_id: int) -> Optional[QuestionBank]:
+        with self._lock:
+            if owner_id in self._loading:
+                self._loading[owner_id] = True
+            return self._banks.get(owner_id)
+
+    def add_quiz(self, quiz: dict) -> None:
+        """Re-index a committed quiz in its owner's bank, if that bank is cached."""
+        bank = self._written(quiz["owner_id"])
+        if bank is not None:
+            bank.add_quiz(quiz)
+
+    def remove_quiz(self, owner_id: int, quiz_id: int) -> None:
+        """Drop a deleted quiz from its owner's bank, if that bank is cached."""
+        bank = self._written(owner_id)
+        if bank is not None:
+            bank.remove_quiz(quiz_id)
+
+
+question_banks = QuestionBankCache()
+
+
+def search_question_bank(
+    owner_id: int,
+    query: str,
+    limit: int,
+    category: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    exclude_texts: Optional[Iterable[str]] = None
+) -> List[dict]:
+    """Search a user's own questions in their cached bank."""
+    if limit <= 0:
+        return []
+    return question_banks.get(owner_id).search(query, limit, category=category, difficulty=difficulty, exclude_texts=exclude_texts)
@@ -0,0 +1,152 @@
+"""
+In-memory denylist of revoked login sessions.
+
+Access tokens carry the id of the session they belong to. Logging out or
+detecting refresh-token reuse revokes the session: a row is written to
+revoked_sessions and the id is added to this denylist. Authenticated requests
+check the denylist in memory only - a Bloom filter answers "definitely not
+revoked" for almost every token and the exact set settles the rare positive -
+so revocation adds no database query per request. Each worker loads the list at
+startup and then pulls new revocations made by other workers periodically.
+"""
+import asyncio
+import hashlib
+import math
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import RevokedSession
+
+BLOOM_CAPACITY = 10000
+BLOOM_ERROR_RATE = 0.01
+DENYLIST_SYNC_INTERVAL = 5.0
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings."""
+
+    def __init__(self, capacity: int = BLOOM_CAPACITY, error_rate: float = BLOOM_ERROR_RATE):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        # Tek bir özetten iki hash türetilir (Kirsch-Mitzenmacher)
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class SessionDenylist:
+    """Revoked session ids with their expiry, fronted by a Bloom filter."""
+
+    def __init__(self, sync_interval: float = DENYLIST_SYNC_INTERVAL):
+        self.sync_interval = sync_interval
+        self._expires: Dict[str, datetime] = {}
+        self._bloom = BloomFilter()
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def is_revoked(self, session_id: str) -> bool:
+        if session_id not in self._bloom:
+            return False
+        expires_at = self._expires.get(session_id)
+        return expires_at is not None and expires_at > datetime.utcnow()
+
+    def add(self, session_id: str, expires_at: datetime) -> None:
+        with self._lock:
+            current = self._expires.get(session_id)
+            if current is None or expires_at > current:
+                self._expires[session_id] = expires_at
+            if len(self._expires) > self._bloom.capacity:
+                self._rebuild()
+            else:
+                self._bloom.add(session_id)
+
+    def _rebuild(self) -> None:
+        """Drop expired ids and size a new filter for the rest."""
+        now = datetime.utcnow()
+        self._expires = {sid: expires for sid, expires in self._expires.items() if expires > now}
+        bloom = BloomFilter(max(BLOOM_CAPACITY, 2 * len(self._expires)))
+        for session_id in self._expires:
+            bloom.add(session_id)
+        self._bloom = bloom
+
+    def load(self, db: Session) -> int:
+        """Purge expired revocations and load the active ones."""
+        db.execute(delete(RevokedSession).where(RevokedSession.expires_at <= datetime.utcnow()))
+        db.commit()
+        self.sync(db)
+        print(f"Session denylist loaded with {len(self)} revoked sessions")
+        return len(self)
+
+    def sync(self, db: Session) -> int:
+        """Pull revocations written since the last sync (possibly by other workers)."""
+        rows = db.execute(
+            select(RevokedSession.id, RevokedSession.session_id, RevokedSession.expires_at)
+            .where(RevokedSession.id > self._last_id)
+            .order_by(RevokedSession.id)
+        ).all()
+        for row_id, session_id, expires_at in rows:
+            self.add(session_id, expires_at)
+            self._last_id = row_id
+        return len(rows)
+
+    def revoke(self, db: Session, session_id: str, expires_at: datetime) -> None:
+        """Persist a revocation (once per session) and apply it locally; the caller commits."""
+        # İptal edilmiş refresh token'ın her tekrarı yeni satır yazmasın; iptalden sonra
+        # oturuma access token verilmediği için ilk kaydın süresi yeterlidir
+        revoked = db.execute(
+            select(RevokedSession.expires_at).where(RevokedSession.session_id == session_id).limit(1)
+        ).first()
+        if revoked is None:
+            db.add(RevokedSession(session_id=session_id, expires_at=expires_at))
+        self.add(session_id, revoked[0] if revoked is not None else expires_at)
+
+    def start(self) -> None:
+        """Start the periodic sync loop on the running event loop."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _sync_once(self) -> None:
+        with SessionLocal() as db:
+            self.sync(db)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await run_in_threadpool(self._sync_once)
+            except Exception as e:
+                print(f"Denylist sync error: {e}")
+
+
+session_denylist = SessionDenylist()
@@ -0,0 +1,124 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.database import get_db
+from app.models import User, Quiz
+from app.schemas import (
+    AttemptSubmit, AttemptBatchSubmit, AttemptResult, AttemptBatchResult, QuizAnalytics
+)
+from app.auth import get_current_active_user
+from app.analytics import load_quiz_analytics
+from app.grading import NO_ANSWER, AnswerKey, answer_keys, attempt_buffer
+from app.serialization import FastJSONResponse
+
+router = APIRouter()
+
+def get_answer_key(db: Session, quiz_id: int, user: User) -> AnswerKey:
+    """Get the cached answer key of a quiz the user can see, or raise 404."""
+    key = answer_keys.get(db, quiz_id)
+    # GET /quizzes/{id} ile aynı kural: başkasının quiz'i yokmuş gibi davranılır,
+    # yoksa deneme sonuçlarından cevap anahtarı çıkarılabilir
+    if key is None or key.owner_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quiz not found"
+        )
+    return key
+
+def grade_submission(
+    key: AnswerKey,
+    answers: list,
+    user_id: Optional[int],
+    participant: Optional[str] = None
+) -> tuple:
+    """Grade one submission and build its result, attempt row and flags."""
+    if len(answers) > len(key):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Quiz has {len(key)} questions, got {len(answers)} answers"
+        )
+
+    score, flags = key.grade(answers)
+    result = {
+        "quiz_id": key.quiz_id,
+        "participant": participant,
+        "score": score,
+        "total": len(key),
+        "results": [flag == 1 for flag in flags]
+    }
+    row = {
+        "quiz_id": key.quiz_id,
+        "user_id": user_id,
+        "participant": participant,
+        "answers": [None if answer == NO_ANSWER else answer for answer in key.encode(answers)],
+        "score": score,
+        "total": len(key)
+    }
+    return result, row, flags
+
+@router.post("/{quiz_id}/attempts", response_model=AttemptResult)
+async def submit_attempt(
+    quiz_id: int,
+    submission: AttemptSubmit,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Submit and grade a single attempt at one of your quizzes."""
+
+    key = get_answer_key(db, quiz_id, current_user)
+    # Bağlantı hemen havuza döner; get_db'nin kapanışı threadpool'da sıra bekler ve
+    # ani deneme yığınlarında havuz o sırada tükenirdi
+    db.close()
+    result, row, flags = grade_submission(key, submission.answers, current_user.id)
+
+    # Deneme tamponlanır ve arka planda toplu olarak yazılır
+    attempt_buffer.add(key, [row], [flags])
+
+    return FastJSONResponse(result)
+
+@router.post("/{quiz_id}/attempts/batch", response_model=AttemptBatchResult)
+async def submit_attempt_batch(
+    quiz_id: int,
+    batch: AttemptBatchSubmit,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Grade a batch of submissions collected by the quiz owner."""
+
+    key = get_answer_key(db, quiz_id, current_user)
+    db.close()
+
+    results = []
+    rows = []
+    flags = []
+    for submission in batch.submissions:
+        result, row, row_flags = grade_submission(key, submission.answers, None, submission.participant)
+        results.append(result)
+        rows.append(row)
+        flags.append(row_flags)
+
+    attempt_buffer.add(key, rows, flags)
+
+    return FastJSONResponse({"quiz_id": quiz_id, "attempts": results})
+
+@router.get("/{quiz_id}/analytics", response_model=QuizAnalytics)
+async def get_quiz_analytics(
+    quiz_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get per-question correctness and answer distributions of a quiz."""
+
+    quiz = db.query(Quiz.id).filter(
+        Quiz.id == quiz_id,
+        Quiz.owner_id == current_user.id
+    ).first()
+
+    if not quiz:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quiz not found"
+        )
+
+    return FastJSONResponse(load_quiz_analytics(db, quiz_id))
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from google.auth.transport import requests
@@ -10,11 +11,11 @@ from app.database import get_db
 from app.models import User
 from app.schemas import (
     UserCreate, UserLogin, User as UserSchema, Token, 
-    GoogleAuth, Message
+    GoogleAuth, RefreshRequest, Message
 )
 from app.auth import (
-    authenticate_user, create_access_token, get_password_hash,
-    get_current_active_user
+    authenticate_user, create_session_tokens, decode_access_token, get_password_hash,
+    get_current_active_user, revoke_session, rotate_refresh_token, security
 )
 
 load_dotenv()
@@ -54,13 +55,8 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
             detail="Email already registered"
         )
     
-    # Create access token
-    access_token = create_access_token(data={"sub": db_user.email})
-    
-    return {
-        "access_token": access_token,
-        "token_type": "bearer"
-    }
+    # Create access and refresh tokens
+    return create_session_tokens(db, db_user)
 
 @router.post("/login", response_model=Token)
 async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db)):
@@ -74,13 +70,8 @@ async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db))
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Create access token
-    access_token = create_access_token(data={"sub": user.email})
-    
-    return {
-        "access_token": access_token,
-        "token_type": "bearer"
-    }
+    # Create access and refresh tokens
+    return create_session_tokens(db, user)
 
 @router.post("/google", response_model=Token)
 async def google_auth(google_auth: GoogleAuth, db: Session = Depends(get_db)):
@@ -129,13 +120,8 @@ async def google_auth(google_auth: GoogleAuth, db: Session = Depends(get_db)):
                 user.google_id = google_id
                 db.commit()
         
-        # Create access token
-        access_token = create_access_token(data={"sub": user.email})
-        
-        return {
-            "access_token": access_token,
-            "token_type": "bearer"
-        }
+        # Create access and refresh tokens
+        return create_session_tokens(db, user)
         
     except ValueError as e:
         raise HTTPException(
@@ -143,12 +129,34 @@ async def google_auth(google_auth: GoogleAuth, db: Session = Depends(get_db)):
             detail="Invalid Google token"
         )
 
+@router.post("/refresh", response_model=Token)
+async def refresh_tokens(request: RefreshRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new token pair (the old refresh token is consumed)."""
+    
+    rotated = rotate_refresh_token(db, request.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    user, session_id = rotated
+    return create_session_tokens(db, user, session_id)
+
 @router.get("/me", response_model=UserSchema)
 async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
     """Get current user information."""
     return current_user
 
 @router.post("/logout", response_model=Message)
-async def logout_user(current_user: User = Depends(get_current_active_user)):
-    """Logout user (client should discard the token)."""
+async def logout_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Logout user by revoking the tokens of the current session."""
+    payload = decode_access_token(credentials.credentials) or {}
+    if payload.get("sid"):
+        revoke_session(db, payload["sid"])
     return {"message": "Successfully logged out"} 
\ No newline at end of file
@@ -0,0 +1,116 @@
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+import orjson
+import secrets
+
+from app.database import SessionLocal
+from app.auth import get_user_from_token
+from app.live import Client, live_answer_key, live_hub
+from app.serialization import dumps, load_quiz_payload
+
+router = APIRouter()
+
+def load_host_quiz(token: str, quiz_id: int):
+    """Authenticate the host token and load the quiz they own."""
+    with SessionLocal() as db:
+        user = get_user_from_token(db, token)
+        if user is None or not user.is_active:
+            return None
+        return load_quiz_payload(db, quiz_id, owner_id=user.id)
+
+async def receive_action(websocket: WebSocket) -> dict:
+    """Receive the next JSON message, ignoring malformed ones."""
+    while True:
+        try:
+            data = orjson.loads(await websocket.receive_text())
+        except orjson.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            return data
+
+@router.websocket("/host/{quiz_id}")
+async def host_session(websocket: WebSocket, quiz_id: int, token: str = Query(...)):
+    """Host a live session of one of your quizzes.
+
+    Actions: {"action": "next"}, {"action": "reveal"}, {"action": "end"}.
+    """
+
+    quiz = await run_in_threadpool(load_host_quiz, token, quiz_id)
+    if not quiz:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Quiz not found")
+        return
+    if not quiz["questions"]:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Quiz has no questions")
+        return
+    answer_key = live_answer_key(quiz)
+    if answer_key is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Quiz has questions without a valid answer")
+        return
+
+    await websocket.accept()
+    host = Client(websocket)
+    session = await live_hub.create_session(quiz, answer_key, host)
+    host.send(dumps({
+        "type": "session",
+        "code": session.code,
+        "quiz_id": session.quiz_id,
+        "title": session.title,
+        "questions": len(session.questions)
+    }).decode())
+
+    try:
+        while True:
+            action = (await receive_action(websocket)).get("action")
+            if action == "next":
+                await session.next_question()
+            elif action == "reveal":
+                await session.reveal()
+            elif action == "end":
+                await session.finish()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await live_hub.close_session(session)
+        await host.close()
+
+@router.websocket("/join/{code}")
+async def join_session(
+    websocket: WebSocket,
+    code: str,
+    name: str = Query(..., min_length=1, max_length=50)
+):
+    """Join a live session as a participant.
+
+    Action: {"action": "answer", "index": <question index>, "option": <option index>}.
+    """
+
+    code = code.upper()
+    if not await live_hub.session_exists(code):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    client = Client(websocket)
+    pid = secrets.token_hex(8)
+    client.send(dumps({"type": "joined", "code": code, "pid": pid}).decode())
+    room = await live_hub.join_room(code, client)
+    await live_hub.send_event(code, {"type": "join", "pid": pid, "name": name})
+
+    try:
+        while True:
+            data = await receive_action(websocket)
+            if data.get("action") == "answer":
+                # Cevap oturum sahibine iletilir; toplama orada O(1) yapılır
+                await live_hub.send_event(code, {
+                    "type": "answer",
+                    "pid": pid,
+                    "index": data.get("index"),
+                    "option": data.get("option")
+                })
+                client.send(dumps({"type": "answer_received", "index": data.get("index")}).decode())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await live_hub.send_event(code, {"type": "leave", "pid": pid})
+        await live_hub.leave_room(room, client)
+        await client.close()
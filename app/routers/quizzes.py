@@ -1,51 +1,144 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Integer, delete, insert, literal, select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import os
-import json
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.schema import HumanMessage
 
-from app.database import get_db
-from app.models import User, Quiz, Question
+from app.database import SessionLocal, get_db
+from app.models import User, Quiz, Question, GenerationLog
 from app.schemas import (
-    QuizCreate, QuizUpdate, Quiz as QuizSchema, QuizSummary,
-    QuizGenerationRequest, QuizListResponse, Message
+    QuizCreate, QuizUpdate, QuizClone, Quiz as QuizSchema,
+    QuizGenerationRequest, QuizListResponse, QuizSearchResponse, ImportResult, Message
 )
 from app.auth import get_current_active_user
+from app import search
+from app.fallback import fallback_templates
+from app.grading import answer_keys
+from app.idempotency import (
+    MAX_KEY_LENGTH, IdempotencyKeyInProgress, IdempotencyKeyReused,
+    complete_key, idempotency_store, request_fingerprint
+)
+from app.llm_parser import QuestionStreamParser
+from app.llm_router import GenerationRequest, llm_router
+from app.question_bank import PLACEHOLDER_OPTIONS, question_banks, search_question_bank
+from app.serialization import FastJSONResponse, load_quiz_payload, load_quiz_summaries
+from app.snapshots import load_snapshot, write_snapshot
+from app.transfer import QuizImporter, iter_export_lines
+from app.usage import (
+    PROMPT_TOKEN_LIMIT, SYSTEM_PROMPT_TOKEN_BUDGET, GenerationUsage, check_prompt_size
+)
 
 load_dotenv()
 
 router = APIRouter()
 
-# LangChain + Gemini configuration
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-def get_gemini_llm():
-    """Get LangChain Gemini LLM instance"""
-    if not GEMINI_API_KEY:
-        return None
-    
-    return ChatGoogleGenerativeAI(
-        model="gemini-1.5-flash",
-        google_api_key=GEMINI_API_KEY,
-        temperature=0.7
-    )
+# Eksik kalan sorular için en fazla kaç ek istek yapılacağı
+MAX_FOLLOWUP_REQUESTS = int(os.getenv("MAX_FOLLOWUP_REQUESTS", "2"))
 
 def generate_quiz_with_ai(
     title: str, 
     prompt: str, 
     question_count: int, 
     difficulty: str,
-    category: str = None
+    category: str = None,
+    use_question_bank: bool = False,
+    usage: Optional[GenerationUsage] = None,
+    owner_id: Optional[int] = None
 ) -> List[dict]:
-    """Generate quiz questions using LangChain + Gemini."""
+    """Generate quiz questions through the LLM provider router."""
+    
+    usage = usage if usage is not None else GenerationUsage()
+    # Soru bankası sadece istendiğinde ve yalnızca kullanıcının kendi sorularıyla kullanılır
+    bank_owner_id = owner_id if use_question_bank else None
+    if not llm_router.available:
+        # Fallback to sample questions if no LLM provider is configured
+        usage.fallback_used = True
+        return generate_sample_questions(
+            question_count, title, prompt, category, difficulty, bank_owner_id=bank_owner_id
+        )
+    
+    system_content = build_system_prompt(difficulty)
+    check_prompt_size(f"system prompt ({difficulty})", system_content, SYSTEM_PROMPT_TOKEN_BUDGET)
+    
+    # Bankada eşleşen sorular varsa önce onlar kullanılır, LLM'den sadece eksik istenir
+    questions = []
+    if bank_owner_id is not None:
+        questions = search_question_bank(
+            bank_owner_id, f"{title} {prompt}", question_count, category=category, difficulty=difficulty
+        )
+        print(f"Question bank provided {len(questions)}/{question_count} questions")
     
-    llm = get_gemini_llm()
-    if not llm:
-        # Fallback to sample questions if Gemini is not configured
-        return generate_sample_questions(question_count, title)
+    try:
+        for attempt in range(1 + MAX_FOLLOWUP_REQUESTS):
+            remaining = question_count - len(questions)
+            if remaining <= 0:
+                break
+            
+            user_content = build_user_prompt(
+                title, prompt, remaining, difficulty, category,
+                existing_questions=questions
+            )
+            # Sistem mesajı kullanıcı mesajıyla birleştirilir
+            combined_content = f"{system_content}\n\n{user_content}"
+            check_prompt_size("generation prompt", combined_content, PROMPT_TOKEN_LIMIT)
+            completion = llm_router.complete(GenerationRequest(
+                combined_content, title, prompt, remaining, difficulty, category
+            ), on_usage=usage.add)
+            
+            # Yanıt parça parça okunur; bozuk/yarım kalan sorular atlanır,
+            # geçerli olanlar korunur ve sadece eksik kısım tekrar istenir
+            parser = QuestionStreamParser(seen_texts=[q["text"] for q in questions])
+            for chunk in completion.chunks:
+                parser.feed(chunk)
+            questions.extend(parser.questions)
+            
+            print(
+                f"{completion.provider}:{completion.model} attempt {attempt + 1}"
+                f"{' (hedged)' if completion.hedged else ''}: {len(parser.questions)} valid, "
+                f"{parser.rejected} rejected in {completion.latency:.2f}s"
+            )
+            if completion.error is not None:
+                raise completion.error
+            if not parser.questions:
+                break
+        
+        # Eğer yeterli soru yoksa, eksikleri sample ile tamamla
+        if len(questions) < question_count:
+            remaining = question_count - len(questions)
+            usage.fallback_used = True
+            sample_questions = generate_sample_questions(
+                remaining, title, prompt, category, difficulty,
+                exclude_texts=[q["text"] for q in questions], bank_owner_id=bank_owner_id
+            )
+            questions.extend(sample_questions)
+        
+        return questions[:question_count]  # Sadece istenen sayıda soru döndür
+        
+    except Exception as e:
+        print(f"LLM generation error: {e}")
+        print(f"Error type: {type(e).__name__}")
+        
+        # LLM API'den gelen specific hatalar
+        if "quota" in str(e).lower() or "limit" in str(e).lower():
+            print("LLM API quota exceeded, using sample questions")
+        elif "key" in str(e).lower() or "auth" in str(e).lower():
+            print("LLM API authentication error, using sample questions")
+        else:
+            print("General LLM error, using sample questions")
+            
+        # Hata öncesinde alınmış geçerli sorular korunur, sadece eksikler tamamlanır
+        remaining = question_count - len(questions)
+        usage.fallback_used = usage.fallback_used or remaining > 0
+        return questions[:question_count] + generate_sample_questions(
+            max(remaining, 0), title, prompt, category, difficulty,
+            exclude_texts=[q["text"] for q in questions], bank_owner_id=bank_owner_id
+        )
+
+def build_system_prompt(difficulty: str) -> str:
+    """Build the fixed instruction part of the generation prompt."""
     
     difficulty_instructions = {
         "easy": "kolay seviyede, temel bilgi gerektiren",
@@ -53,7 +146,7 @@ def generate_quiz_with_ai(
         "hard": "zor seviyede, derin düşünme gerektiren"
     }
     
-    system_content = f"""Sen uzman bir quiz oluşturucususun. Verilen konuda {difficulty_instructions.get(difficulty, 'orta seviyede')} çoktan seçmeli sorular hazırlarsın.
+    return f"""Sen uzman bir quiz oluşturucususun. Verilen konuda {difficulty_instructions.get(difficulty, 'orta seviyede')} çoktan seçmeli sorular hazırlarsın.
 
 KURALLAR:
 - Her soru için 4 seçenek (A, B, C, D) oluştur
@@ -73,209 +166,239 @@ KURALLAR:
   ]
 }}"""
 
-    user_content = f"""GÖREV: {question_count} adet çoktan seçmeli soru oluştur
+def build_user_prompt(
+    title: str,
+    prompt: str,
+    question_count: int,
+    difficulty: str,
+    category: str = None,
+    existing_questions: List[dict] = None
+) -> str:
+    """Build the task part of the generation prompt."""
+    
+    content = f"""GÖREV: {question_count} adet çoktan seçmeli soru oluştur
 
 KONU: {title}
 AÇIKLAMA: {prompt}
 ZORLUİK: {difficulty}
 {f'KATEGORİ: {category}' if category else ''}
-
+"""
+    
+    if existing_questions:
+        existing = "\n".join(f"- {q['text']}" for q in existing_questions)
+        content += f"""
+Aşağıdaki sorular zaten hazır, bunları veya benzerlerini TEKRAR ETME:
+{existing}
+"""
+    
+    content += f"""
 Lütfen yukarıdaki JSON formatında tam olarak {question_count} adet soru oluştur."""
+    return content
 
-    try:
-        # Gemini için sistem mesajını kullanıcı mesajıyla birleştiriyoruz
-        combined_content = f"{system_content}\n\n{user_content}"
-        messages = [HumanMessage(content=combined_content)]
-        
-        response = llm.invoke(messages)
-        content = response.content
-        
-        # JSON içeriğini temizle ve parse et
-        content = content.strip()
-        if content.startswith('```json'):
-            content = content[7:]
-        if content.endswith('```'):
-            content = content[:-3]
-        content = content.strip()
-        
-        quiz_data = json.loads(content)
-        questions = quiz_data.get("questions", [])
-        
-        # Eğer yeterli soru yoksa, eksikleri sample ile tamamla
-        if len(questions) < question_count:
-            remaining = question_count - len(questions)
-            sample_questions = generate_sample_questions(remaining, title)
-            questions.extend(sample_questions)
-        
-        return questions[:question_count]  # Sadece istenen sayıda soru döndür
-        
-    except Exception as e:
-        print(f"Gemini AI generation error: {e}")
-        print(f"Error type: {type(e).__name__}")
-        
-        # Gemini API'den gelen specific hatalar
-        if "quota" in str(e).lower() or "limit" in str(e).lower():
-            print("Gemini API quota exceeded, using sample questions")
-        elif "key" in str(e).lower() or "auth" in str(e).lower():
-            print("Gemini API authentication error, using sample questions")
-        else:
-            print("General Gemini error, using sample questions")
-            
-        # Fallback to sample questions if AI generation fails
-        return generate_sample_questions(question_count, title)
-
-def generate_sample_questions(count: int, title: str) -> List[dict]:
-    """Generate sample questions when AI is not available."""
+def generate_sample_questions(
+    count: int,
+    title: str,
+    prompt: str = None,
+    category: str = None,
+    difficulty: str = None,
+    exclude_texts: List[str] = None,
+    bank_owner_id: Optional[int] = None
+) -> List[dict]:
+    """Generate sample questions when AI is not available; bank_owner_id opts into that user's question bank."""
     print(f"Generating {count} sample questions for topic: {title}")
     
-    # Konu bazlı sample sorular
-    sample_templates = {
-        "matematik": [
-            "2x + 5 = 15 denkleminde x'in değeri nedir?",
-            "Bir üçgenin iç açılarının toplamı kaç derecedir?", 
-            "√16 ifadesinin değeri nedir?",
-            "y = 2x + 3 doğrusunun eğimi nedir?"
-        ],
-        "fen": [
-            "Su molekülünün kimyasal formülü nedir?",
-            "Işık hızı yaklaşık olarak saniyede kaç kilometre?",
-            "Atomun çekirdeğinde hangi parçacıklar bulunur?",
-            "Newton'un kaç hareket yasası vardır?"
-        ],
-        "tarih": [
-            "Osmanlı İmparatorluğu hangi yılda kurulmuştur?",
-            "Cumhuriyet hangi tarihte ilan edilmiştir?",
-            "İstanbul'un fetih tarihi nedir?",
-            "Atatürk hangi şehirde doğmuştur?"
-        ]
-    }
-    
-    # Başlığa göre uygun soruları seç
-    title_lower = title.lower()
-    template_questions = []
+    # İstendiyse önce kullanıcının kendi bankasındaki konuya uygun doğrulanmış sorular kullanılır
+    questions = []
+    if bank_owner_id is not None:
+        query = f"{title} {prompt}" if prompt else title
+        questions = search_question_bank(
+            bank_owner_id, query, count, category=category, difficulty=difficulty, exclude_texts=exclude_texts
+        )
     
-    if any(word in title_lower for word in ["matematik", "mat", "hesap", "sayı"]):
-        template_questions = sample_templates["matematik"]
-    elif any(word in title_lower for word in ["fen", "fizik", "kimya", "biyoloji"]):
-        template_questions = sample_templates["fen"] 
-    elif any(word in title_lower for word in ["tarih", "cumhuriyet", "osmanlı"]):
-        template_questions = sample_templates["tarih"]
+    # Bankada yeterli soru yoksa konuya uygun hazır şablon sorularla tamamla
+    if len(questions) < count:
+        questions += fallback_templates.questions_for(
+            count - len(questions), title, prompt, category, difficulty,
+            exclude_texts=(exclude_texts or []) + [q["text"] for q in questions]
+        )
     
-    questions = []
-    for i in range(count):
-        if template_questions and i < len(template_questions):
-            text = template_questions[i]
-            # Konuya uygun seçenekler
-            if "matematik" in title_lower:
-                options = ["5", "3", "10", "7"] if "2x + 5" in text else ["180°", "90°", "360°", "270°"]
-                correct = 0 if "2x + 5" in text else 0
-            else:
-                options = ["Seçenek A", "Seçenek B", "Seçenek C", "Seçenek D"] 
-                correct = 0
-        else:
-            text = f"{title} konusu ile ilgili {i + 1}. soru. Bu soruyu düzenleyerek kendi sorunuzu yazabilirsiniz."
-            options = ["Seçenek A", "Seçenek B", "Seçenek C", "Seçenek D"]
-            correct = 0
-            
+    # Konu eşleşmezse düzenlenebilir yer tutucularla tamamla
+    for i in range(len(questions), count):
         questions.append({
-            "text": text,
-            "options": options,
-            "correct": correct
+            "text": f"{title} konusu ile ilgili {i + 1}. soru. Bu soruyu düzenleyerek kendi sorunuzu yazabilirsiniz.",
+            "options": list(PLACEHOLDER_OPTIONS),
+            "correct": 0
         })
     
     return questions
 
-@router.post("/", response_model=QuizSchema)
-async def create_quiz(
-    quiz_data: QuizCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
-    """Create a new quiz with AI-generated questions."""
-    
-    # Create quiz
-    db_quiz = Quiz(
-        title=quiz_data.title,
-        prompt=quiz_data.prompt,
-        category=quiz_data.category,
-        difficulty=quiz_data.difficulty,
-        owner_id=current_user.id
-    )
-    
-    db.add(db_quiz)
+def commit_quiz(db: Session, quiz_id: int) -> dict:
+    """Flush pending quiz changes, rebuild its snapshot, sync the search index and commit."""
+    db.flush()
+    quiz = load_quiz_payload(db, quiz_id)
+    write_snapshot(db, quiz)
+    search.index_quiz(db, quiz)
     db.commit()
-    db.refresh(db_quiz)
     
-    # Generate questions with AI
-    questions_data = generate_quiz_with_ai(
+    # Commit başarılı olduktan sonra bellek içi indeksler güncellenir
+    answer_keys.invalidate(quiz_id)
+    question_banks.add_quiz(quiz)
+    return quiz
+
+def clone_quiz_rows(db: Session, quiz_id: int, owner_id: int, title: Optional[str] = None) -> Optional[int]:
+    """Copy a quiz and its questions with INSERT ... SELECT; returns the new quiz id, or None if not found."""
+    new_quiz_id = db.execute(
+        insert(Quiz)
+        .from_select(
+            ["title", "prompt", "category", "difficulty", "owner_id"],
+            select(
+                literal(title) if title is not None else Quiz.title,
+                Quiz.prompt, Quiz.category, Quiz.difficulty, Quiz.owner_id
+            ).where(Quiz.id == quiz_id, Quiz.owner_id == owner_id)
+        )
+        .returning(Quiz.id)
+    ).scalar_one_or_none()
+    if new_quiz_id is None:
+        return None
+    
+    # Sorular uygulamaya taşınmadan veritabanı içinde kopyalanır
+    db.execute(
+        insert(Question).from_select(
+            ["quiz_id", "text", "options", "correct", "order"],
+            select(
+                literal(new_quiz_id, Integer), Question.text, Question.options, Question.correct, Question.order
+            ).where(Question.quiz_id == quiz_id).order_by(Question.order, Question.id)
+        )
+    )
+    return new_quiz_id
+
+def save_generated_quiz(
+    owner_id: int,
+    quiz_data,
+    questions_data: List[dict],
+    idempotency_key: Optional[str] = None,
+    usage: Optional[GenerationUsage] = None
+) -> dict:
+    """Write a quiz, its generated questions and the generation log in a single transaction."""
+    with SessionLocal() as db:
+        db_quiz = Quiz(
+            title=quiz_data.title,
+            prompt=quiz_data.prompt,
+            category=quiz_data.category,
+            difficulty=quiz_data.difficulty,
+            owner_id=owner_id
+        )
+        db_quiz.questions = [
+            Question(
+                text=question_data["text"],
+                options=question_data["options"],
+                correct=question_data["correct"],
+                order=order
+            )
+            for order, question_data in enumerate(questions_data)
+        ]
+        db.add(db_quiz)
+        db.flush()
+        if idempotency_key:
+            complete_key(db, owner_id, idempotency_key, db_quiz.id)
+        log_id = None
+        if usage is not None:
+            log = GenerationLog(**usage.to_row(owner_id, db_quiz.id, quiz_data.question_count))
+            db.add(log)
+            db.flush()
+            log_id = log.id
+        quiz = commit_quiz(db, db_quiz.id)
+    if log_id is not None:
+        # Hâlâ süren, yarışı kaybetmiş hedge çağrıları bitince bu satıra eklenir
+        usage.persisted(log_id)
+    return quiz
+
+async def generate_and_save_quiz(quiz_data, owner_id: int, idempotency_key: Optional[str] = None) -> dict:
+    """Generate questions without holding a DB connection, then save the quiz."""
+    
+    # LLM çağrısı sürerken havuzdan bağlantı alınmaz; quiz ancak sorular hazır olunca yazılır,
+    # böylece üretim hatasında boş quiz kalmaz
+    usage = GenerationUsage()
+    questions_data = await run_in_threadpool(
+        generate_quiz_with_ai,
         quiz_data.title,
         quiz_data.prompt,
         quiz_data.question_count,
         quiz_data.difficulty,
-        quiz_data.category
+        quiz_data.category,
+        quiz_data.use_question_bank,
+        usage,
+        owner_id
+    )
+    return await run_in_threadpool(
+        save_generated_quiz, owner_id, quiz_data, questions_data, idempotency_key, usage
     )
+
+async def idempotent_generation(
+    request: Request,
+    quiz_data,
+    owner_id: int,
+    idempotency_key: Optional[str]
+) -> FastJSONResponse:
+    """Generate a quiz at most once per Idempotency-Key, replaying the result for retries."""
+    
+    if not idempotency_key:
+        return FastJSONResponse(await generate_and_save_quiz(quiz_data, owner_id))
+    
+    if len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters"
+        )
     
-    # Save questions to database
-    for order, question_data in enumerate(questions_data):
-        db_question = Question(
-            quiz_id=db_quiz.id,
-            text=question_data["text"],
-            options=question_data["options"],
-            correct=question_data["correct"],
-            order=order
+    try:
+        quiz, replayed = await idempotency_store.run(
+            owner_id,
+            idempotency_key,
+            request_fingerprint(request.url.path, quiz_data.model_dump()),
+            lambda: generate_and_save_quiz(quiz_data, owner_id, idempotency_key)
+        )
+    except IdempotencyKeyReused:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request"
+        )
+    except IdempotencyKeyInProgress:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still in progress"
         )
-        db.add(db_question)
     
-    db.commit()
-    db.refresh(db_quiz)
+    if quiz is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quiz not found"
+        )
+    
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return FastJSONResponse(quiz, headers=headers)
+
+@router.post("/", response_model=QuizSchema)
+async def create_quiz(
+    request: Request,
+    quiz_data: QuizCreate,
+    current_user: User = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(None)
+):
+    """Create a new quiz with AI-generated questions."""
     
-    return db_quiz
+    return await idempotent_generation(request, quiz_data, current_user.id, idempotency_key)
 
 @router.post("/generate", response_model=QuizSchema)
 async def generate_quiz(
+    request: Request,
     generation_request: QuizGenerationRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    idempotency_key: Optional[str] = Header(None)
 ):
     """Generate a quiz using AI based on the request."""
     
-    # Create quiz
-    db_quiz = Quiz(
-        title=generation_request.title,
-        prompt=generation_request.prompt,
-        category=generation_request.category,
-        difficulty=generation_request.difficulty,
-        owner_id=current_user.id
-    )
-    
-    db.add(db_quiz)
-    db.commit()
-    db.refresh(db_quiz)
-    
-    # Generate questions with AI
-    questions_data = generate_quiz_with_ai(
-        generation_request.title,
-        generation_request.prompt,
-        generation_request.question_count,
-        generation_request.difficulty,
-        generation_request.category
-    )
-    
-    # Save questions to database
-    for order, question_data in enumerate(questions_data):
-        db_question = Question(
-            quiz_id=db_quiz.id,
-            text=question_data["text"],
-            options=question_data["options"],
-            correct=question_data["correct"],
-            order=order
-        )
-        db.add(db_question)
-    
-    db.commit()
-    db.refresh(db_quiz)
-    
-    return db_quiz
+    return await idempotent_generation(request, generation_request, current_user.id, idempotency_key)
 
 @router.get("/", response_model=QuizListResponse)
 async def get_user_quizzes(
@@ -286,40 +409,51 @@ async def get_user_quizzes(
 ):
     """Get all quizzes for the current user."""
     
-    # Eager load questions ile quiz'leri çek
-    from sqlalchemy.orm import joinedload
-    
-    quizzes = db.query(Quiz).options(
-        joinedload(Quiz.questions)
-    ).filter(
-        Quiz.owner_id == current_user.id
-    ).offset(skip).limit(limit).all()
+    # Soru sayıları tek sorguda, satırlardan doğrudan hesaplanır
+    quiz_summaries = load_quiz_summaries(db, current_user.id, skip, limit)
+    total = db.query(Quiz).filter(Quiz.owner_id == current_user.id).count()
     
-    print(f"Found {len(quizzes)} quizzes for user {current_user.id}")
+    return FastJSONResponse({"quizzes": quiz_summaries, "total": total})
+
+@router.get("/search", response_model=QuizSearchResponse)
+async def search_user_quizzes(
+    q: str = Query(..., min_length=1, max_length=200),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Full-text search over the current user's quizzes and questions."""
     
-    # Convert to summary format with question count
-    quiz_summaries = []
-    for quiz in quizzes:
-        question_count = len(quiz.questions) if quiz.questions else 0
-        print(f"Quiz {quiz.id} '{quiz.title}' has {question_count} questions")
-        
-        quiz_summary = QuizSummary(
-            id=quiz.id,
-            title=quiz.title,
-            prompt=quiz.prompt,
-            category=quiz.category,
-            difficulty=quiz.difficulty,
-            owner_id=quiz.owner_id,
-            created_at=quiz.created_at,
-            question_count=question_count
-        )
-        quiz_summaries.append(quiz_summary)
+    results = search.search_quizzes(db, current_user.id, q, skip, limit)
     
-    print(f"Returning {len(quiz_summaries)} quiz summaries")
+    return FastJSONResponse(results)
+
+@router.get("/export")
+async def export_quizzes(current_user: User = Depends(get_current_active_user)):
+    """Stream all quizzes of the current user as NDJSON (one quiz per line)."""
+    
+    return StreamingResponse(
+        iter_export_lines(current_user.id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="quizzes.ndjson"'}
+    )
+
+@router.post("/import", response_model=ImportResult)
+async def import_quizzes(
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Import quizzes from an NDJSON request body, committed in batches."""
     
-    total = db.query(Quiz).filter(Quiz.owner_id == current_user.id).count()
+    importer = QuizImporter(db, current_user.id)
+    async for chunk in request.stream():
+        if importer.feed(chunk):
+            await run_in_threadpool(importer.flush)
+    await run_in_threadpool(importer.finish)
     
-    return QuizListResponse(quizzes=quiz_summaries, total=total)
+    return FastJSONResponse(importer.result())
 
 @router.get("/{quiz_id}", response_model=QuizSchema)
 async def get_quiz(
@@ -329,10 +463,12 @@ async def get_quiz(
 ):
     """Get a specific quiz with all questions."""
     
-    quiz = db.query(Quiz).filter(
-        Quiz.id == quiz_id,
-        Quiz.owner_id == current_user.id
-    ).first()
+    # Önceden serileştirilmiş belge tek bir birincil anahtar sorgusuyla okunur
+    snapshot = load_snapshot(db, quiz_id, current_user.id)
+    if snapshot is not None:
+        return FastJSONResponse(snapshot[0])
+    
+    quiz = load_quiz_payload(db, quiz_id, owner_id=current_user.id)
     
     if not quiz:
         raise HTTPException(
@@ -340,7 +476,31 @@ async def get_quiz(
             detail="Quiz not found"
         )
     
-    return quiz
+    # Snapshot'ı olmayan eski quizler bellekte serileştirilir; kalıcı hale getirmek
+    # yazma yollarının ve backfill-snapshots komutunun işidir
+    return FastJSONResponse(quiz)
+
+@router.post("/{quiz_id}/clone", response_model=QuizSchema)
+async def clone_quiz(
+    quiz_id: int,
+    clone_request: Optional[QuizClone] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Copy a quiz and its questions into a new quiz of the current user."""
+    
+    title = clone_request.title if clone_request is not None else None
+    new_quiz_id = clone_quiz_rows(db, quiz_id, current_user.id, title)
+    
+    if new_quiz_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quiz not found"
+        )
+    
+    quiz = commit_quiz(db, new_quiz_id)
+    
+    return FastJSONResponse(quiz)
 
 @router.put("/{quiz_id}", response_model=QuizSchema)
 async def update_quiz(
@@ -371,7 +531,7 @@ async def update_quiz(
     
     # Update questions if provided
     if quiz_update.questions is not None:
-        # Delete existing questions
+        # Delete existing questions (their aggregated analytics go with them via ON DELETE CASCADE)
         db.query(Question).filter(Question.quiz_id == quiz_id).delete()
         
         # Add new questions
@@ -385,10 +545,9 @@ async def update_quiz(
             )
             db.add(db_question)
     
-    db.commit()
-    db.refresh(quiz)
+    quiz = commit_quiz(db, quiz_id)
     
-    return quiz
+    return FastJSONResponse(quiz)
 
 @router.delete("/{quiz_id}", response_model=Message)
 async def delete_quiz(
@@ -398,18 +557,20 @@ async def delete_quiz(
 ):
     """Delete a quiz and all its questions."""
     
-    quiz = db.query(Quiz).filter(
-        Quiz.id == quiz_id,
-        Quiz.owner_id == current_user.id
-    ).first()
+    # Sorular, istatistikler, denemeler ve snapshot ON DELETE CASCADE ile aynı ifadede silinir
+    deleted = db.execute(
+        delete(Quiz).where(Quiz.id == quiz_id, Quiz.owner_id == current_user.id)
+    ).rowcount
     
-    if not quiz:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Quiz not found"
         )
     
-    db.delete(quiz)
+    search.remove_deleted_quiz(db, quiz_id)
     db.commit()
+    answer_keys.invalidate(quiz_id)
+    question_banks.remove_quiz(current_user.id, quiz_id)
     
-    return {"message": "Quiz deleted successfully"} 
\ No newline at end of file
+    return {"message": "Quiz deleted successfully"}
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models import User
+from app.schemas import UsageReport
+from app.auth import get_current_active_user
+from app.serialization import FastJSONResponse
+from app.usage import load_usage_report
+
+router = APIRouter()
+
+@router.get("/report", response_model=UsageReport)
+async def get_usage_report(
+    days: int = Query(30, ge=1, le=365),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get LLM token usage and estimated cost of your quiz generations per day."""
+    
+    return FastJSONResponse(load_usage_report(db, current_user.id, days))
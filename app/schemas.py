@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, EmailStr, model_validator
+from typing import Dict, List, Optional
 from datetime import datetime
 
 # User Schemas
@@ -29,6 +29,11 @@ class User(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     email: Optional[str] = None
@@ -39,10 +44,18 @@ class QuestionBase(BaseModel):
     options: List[str]
     correct: int
 
-class QuestionCreate(QuestionBase):
+class QuestionInput(QuestionBase):
+    @model_validator(mode="after")
+    def check_correct(self):
+        # Doğru cevap şıklardan birinin indeksi olmalı; aralık dışı değerler hiç kaydedilmez
+        if not 0 <= self.correct < len(self.options):
+            raise ValueError("correct must be the index of one of the options")
+        return self
+
+class QuestionCreate(QuestionInput):
     order: Optional[int] = 0
 
-class QuestionUpdate(QuestionBase):
+class QuestionUpdate(QuestionInput):
     order: Optional[int] = None
 
 class Question(QuestionBase):
@@ -63,10 +76,14 @@ class QuizBase(BaseModel):
 
 class QuizCreate(QuizBase):
     question_count: Optional[int] = 10
+    use_question_bank: bool = False
 
 class QuizUpdate(QuizBase):
     questions: Optional[List[QuestionUpdate]] = None
 
+class QuizClone(BaseModel):
+    title: Optional[str] = None  # Verilmezse kaynak quizin başlığı kullanılır
+
 class Quiz(QuizBase):
     id: int
     owner_id: int
@@ -85,6 +102,71 @@ class QuizSummary(QuizBase):
     class Config:
         from_attributes = True
 
+class QuizSearchResult(QuizBase):
+    id: int
+    owner_id: int
+    created_at: datetime
+    snippet: str
+    score: float
+
+class QuizSearchResponse(BaseModel):
+    results: List[QuizSearchResult]
+    total: int
+
+# Import/Export Schemas
+class QuizImport(QuizBase):
+    questions: List[QuestionUpdate] = []
+
+class ImportLineError(BaseModel):
+    line: int
+    error: str
+
+class ImportResult(BaseModel):
+    imported_quizzes: int
+    imported_questions: int
+    error_count: int
+    errors: List[ImportLineError]
+
+# Attempt Schemas
+class AttemptSubmit(BaseModel):
+    answers: List[Optional[int]]
+
+class BatchSubmission(AttemptSubmit):
+    participant: Optional[str] = None
+
+class AttemptBatchSubmit(BaseModel):
+    submissions: List[BatchSubmission]
+
+class AttemptResult(BaseModel):
+    quiz_id: int
+    participant: Optional[str] = None
+    score: int
+    total: int
+    results: List[bool]
+
+class AttemptBatchResult(BaseModel):
+    quiz_id: int
+    attempts: List[AttemptResult]
+
+# Analytics Schemas
+class QuestionAnalytics(BaseModel):
+    question_id: int
+    text: str
+    order: int
+    attempts: int
+    correct: int
+    skipped: int
+    correct_rate: Optional[float] = None
+    answer_distribution: List[int]
+
+class QuizAnalytics(BaseModel):
+    quiz_id: int
+    attempts: int
+    average_score: Optional[float] = None
+    average_percent: Optional[float] = None
+    score_distribution: Dict[str, int]
+    questions: List[QuestionAnalytics]
+
 # AI Generation Schemas
 class QuizGenerationRequest(BaseModel):
     title: str
@@ -92,6 +174,24 @@ class QuizGenerationRequest(BaseModel):
     question_count: int = 10
     difficulty: str = "medium"
     category: Optional[str] = None
+    use_question_bank: bool = False
+
+# Usage Schemas
+class UsageTotals(BaseModel):
+    generations: int
+    llm_calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    cost_usd: float
+    fallbacks: int
+
+class UsageDay(UsageTotals):
+    day: str
+    avg_latency_ms: float
+
+class UsageReport(BaseModel):
+    days: List[UsageDay]
+    totals: UsageTotals
 
 # Response Schemas
 class Message(BaseModel):
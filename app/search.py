@@ -0,0 +1,220 @@
+"""
+Full-text search index over quizzes and their questions.
+
+SQLite uses an FTS5 virtual table, PostgreSQL a tsvector column with a GIN
+index. There is one index row per quiz; the quiz write paths keep it in sync
+inside the same transaction as the quiz itself. In FTS5 the owner id is an
+indexed column and part of the MATCH expression, so a search only walks the
+caller's rows instead of ranking every user's matches and filtering after.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models import Quiz
+from app.serialization import QUIZ_COLUMNS, load_quiz_payload, quiz_row_to_dict
+
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+SNIPPET_TOKENS = 12
+
+# PostgreSQL metin arama yapılandırması
+PG_TEXT_CONFIG = "simple"
+
+_QUERY_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS quiz_search USING fts5(
+        title, category, prompt, questions, owner_id,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+]
+# Kullanıcının arama terimleri yalnızca bu sütunlarda eşleşir, owner_id'de değil
+SQLITE_TEXT_COLUMNS = "{title category prompt questions}"
+
+POSTGRES_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS quiz_search (
+        quiz_id INTEGER PRIMARY KEY REFERENCES quizzes(id) ON DELETE CASCADE,
+        owner_id INTEGER NOT NULL,
+        content TEXT NOT NULL,
+        document TSVECTOR NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_quiz_search_owner_id ON quiz_search (owner_id)",
+    "CREATE INDEX IF NOT EXISTS ix_quiz_search_document ON quiz_search USING GIN (document)",
+]
+
+
+def _dialect(bind) -> str:
+    return bind.dialect.name
+
+
+def create_search_index(engine: Engine) -> None:
+    """Create the search index table for the current database."""
+    statements = SQLITE_DDL if _dialect(engine) == "sqlite" else POSTGRES_DDL
+    with engine.begin() as conn:
+        if _dialect(engine) == "sqlite":
+            ddl = conn.execute(text(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'quiz_search'"
+            )).scalar()
+            if ddl and "UNINDEXED" in ddl:
+                # owner_id'nin indekslenmediği eski tablo: yeniden oluşturulur, boş kalınca doldurulur
+                conn.execute(text("DROP TABLE quiz_search"))
+        for statement in statements:
+            conn.execute(text(statement))
+
+
+def _question_text(quiz: Dict[str, Any]) -> str:
+    return "\n".join(question["text"] for question in quiz.get("questions", []))
+
+
+def index_quiz(db: Session, quiz: Dict[str, Any]) -> None:
+    """Insert or replace the index row of a quiz payload."""
+    remove_quiz(db, quiz["id"])
+    params = {
+        "quiz_id": quiz["id"],
+        "owner_id": quiz["owner_id"],
+        "title": quiz["title"],
+        "category": quiz["category"] or "",
+        "prompt": quiz["prompt"],
+        "questions": _question_text(quiz),
+    }
+
+    if _dialect(db.bind) == "sqlite":
+        db.execute(text(
+            "INSERT INTO quiz_search (rowid, title, category, prompt, questions, owner_id) "
+            "VALUES (:quiz_id, :title, :category, :prompt, :questions, :owner_id)"
+        ), params)
+    else:
+        db.execute(text(f"""
+            INSERT INTO quiz_search (quiz_id, owner_id, content, document)
+            VALUES (
+                :quiz_id, :owner_id,
+                concat_ws(' ', :title, :category, :prompt, :questions),
+                setweight(to_tsvector('{PG_TEXT_CONFIG}', :title), 'A') ||
+                setweight(to_tsvector('{PG_TEXT_CONFIG}', :category), 'B') ||
+                setweight(to_tsvector('{PG_TEXT_CONFIG}', :prompt), 'C') ||
+                setweight(to_tsvector('{PG_TEXT_CONFIG}', :questions), 'D')
+            )
+        """), params)
+
+
+def remove_quiz(db: Session, quiz_id: int) -> None:
+    """Delete the index row of a quiz."""
+    if _dialect(db.bind) == "sqlite":
+        db.execute(text("DELETE FROM quiz_search WHERE rowid = :quiz_id"), {"quiz_id": quiz_id})
+    else:
+        db.execute(text("DELETE FROM quiz_search WHERE quiz_id = :quiz_id"), {"quiz_id": quiz_id})
+
+
+def remove_deleted_quiz(db: Session, quiz_id: int) -> None:
+    """Delete the index row of a quiz that was just deleted."""
+    # PostgreSQL'de satır ON DELETE CASCADE ile gider; FTS5 tablosunun foreign key'i yok
+    if _dialect(db.bind) == "sqlite":
+        remove_quiz(db, quiz_id)
+
+
+def rebuild_search_index(db: Session) -> int:
+    """Re-index every quiz; returns the number of indexed quizzes."""
+    db.execute(text("DELETE FROM quiz_search"))
+    quiz_ids = db.scalars(select(Quiz.id).order_by(Quiz.id)).all()
+    for quiz_id in quiz_ids:
+        index_quiz(db, load_quiz_payload(db, quiz_id))
+    db.commit()
+    return len(quiz_ids)
+
+
+def ensure_search_index(engine: Engine, db: Session) -> None:
+    """Create the index and backfill it when it is empty but quizzes exist."""
+    create_search_index(engine)
+    indexed = db.execute(text("SELECT count(*) FROM quiz_search")).scalar()
+    if not indexed and db.query(Quiz.id).first() is not None:
+        count = rebuild_search_index(db)
+        print(f"Search index backfilled with {count} quizzes")
+
+
+def _fts5_query(owner_id: int, query: str) -> Optional[str]:
+    """Turn free text into a safe FTS5 query over one owner's rows (all terms, prefix match)."""
+    tokens = _QUERY_TOKEN.findall(query)
+    if not tokens:
+        return None
+    terms = " ".join(f'"{token}"*' for token in tokens)
+    return f'owner_id:"{int(owner_id)}" AND {SQLITE_TEXT_COLUMNS}: ({terms})'
+
+
+def _search_sqlite(db: Session, owner_id: int, query: str, skip: int, limit: int) -> Tuple[List[tuple], int]:
+    match = _fts5_query(owner_id, query)
+    if match is None:
+        return [], 0
+
+    params = {"match": match, "skip": skip, "limit": limit}
+    rows = db.execute(text(f"""
+        SELECT rowid,
+               snippet(quiz_search, -1, '{SNIPPET_START}', '{SNIPPET_END}', '…', {SNIPPET_TOKENS}),
+               bm25(quiz_search, 10.0, 5.0, 2.0, 1.0, 0.0) AS score
+        FROM quiz_search
+        WHERE quiz_search MATCH :match
+        ORDER BY score
+        LIMIT :limit OFFSET :skip
+    """), params).all()
+    total = db.execute(text(
+        "SELECT count(*) FROM quiz_search WHERE quiz_search MATCH :match"
+    ), params).scalar()
+
+    # bm25 küçük = daha iyi; API'de büyük skor daha iyi olsun
+    return [(row[0], row[1], -row[2]) for row in rows], total
+
+
+def _search_postgres(db: Session, owner_id: int, query: str, skip: int, limit: int) -> Tuple[List[tuple], int]:
+    params = {"query": query, "owner_id": owner_id, "skip": skip, "limit": limit}
+    rows = db.execute(text(f"""
+        WITH ranked AS (
+            SELECT quiz_id, content, ts_rank_cd(document, q) AS score, q
+            FROM quiz_search, websearch_to_tsquery('{PG_TEXT_CONFIG}', :query) AS q
+            WHERE owner_id = :owner_id AND document @@ q
+            ORDER BY score DESC
+            LIMIT :limit OFFSET :skip
+        )
+        SELECT quiz_id,
+               ts_headline('{PG_TEXT_CONFIG}', content, q,
+                           'StartSel={SNIPPET_START}, StopSel={SNIPPET_END}, MaxWords={SNIPPET_TOKENS}, MinWords=3'),
+               score
+        FROM ranked
+        ORDER BY score DESC
+    """), params).all()
+    total = db.execute(text(f"""
+        SELECT count(*) FROM quiz_search
+        WHERE owner_id = :owner_id AND document @@ websearch_to_tsquery('{PG_TEXT_CONFIG}', :query)
+    """), params).scalar()
+    return [tuple(row) for row in rows], total
+
+
+def search_quizzes(db: Session, owner_id: int, query: str, skip: int = 0, limit: int = 20) -> Dict[str, Any]:
+    """Return ranked, paginated quiz matches with snippets."""
+    if _dialect(db.bind) == "sqlite":
+        matches, total = _search_sqlite(db, owner_id, query, skip, limit)
+    else:
+        matches, total = _search_postgres(db, owner_id, query, skip, limit)
+
+    quiz_rows = {}
+    if matches:
+        ids = [match[0] for match in matches]
+        quiz_rows = {row[0]: row for row in db.execute(select(*QUIZ_COLUMNS).where(Quiz.id.in_(ids)))}
+
+    results = []
+    for quiz_id, snippet, score in matches:
+        row = quiz_rows.get(quiz_id)
+        if row is None:
+            continue
+        result = quiz_row_to_dict(row)
+        result["snippet"] = snippet
+        result["score"] = float(score)
+        results.append(result)
+
+    return {"results": results, "total": total}
@@ -0,0 +1,133 @@
+"""
+Fast JSON serialization for quiz responses.
+
+Responses are built straight from row tuples and encoded with orjson, so the
+ORM objects never go through a second round of pydantic validation.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+import orjson
+from fastapi.responses import Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import Quiz, Question
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+QUIZ_COLUMNS = (
+    Quiz.id, Quiz.title, Quiz.prompt, Quiz.category,
+    Quiz.difficulty, Quiz.owner_id, Quiz.created_at
+)
+
+QUESTION_COLUMNS = (
+    Question.id, Question.quiz_id, Question.text, Question.options,
+    Question.correct, Question.order, Question.created_at
+)
+
+
+def dumps(data: Any) -> bytes:
+    """Encode data as JSON bytes."""
+    return orjson.dumps(data, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(Response):
+    """JSON response that encodes with orjson and accepts pre-encoded bytes."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+def question_row_to_dict(row) -> Dict[str, Any]:
+    """Build a question payload from a QUESTION_COLUMNS row."""
+    return {
+        "text": row[2],
+        "options": row[3],
+        "correct": row[4],
+        "id": row[0],
+        "quiz_id": row[1],
+        "order": row[5],
+        "created_at": row[6],
+    }
+
+
+def quiz_row_to_dict(row, questions: Optional[Iterable] = None) -> Dict[str, Any]:
+    """Build a quiz payload from a QUIZ_COLUMNS row and its question rows."""
+    data = {
+        "title": row[1],
+        "prompt": row[2],
+        "category": row[3],
+        "difficulty": row[4],
+        "id": row[0],
+        "owner_id": row[5],
+        "created_at": row[6],
+    }
+    if questions is not None:
+        data["questions"] = [question_row_to_dict(q) for q in questions]
+    return data
+
+
+def load_quiz_payload(db: Session, quiz_id: int, owner_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Load a quiz with its questions as a plain dict, or None if not found."""
+    query = select(*QUIZ_COLUMNS).where(Quiz.id == quiz_id)
+    if owner_id is not None:
+        query = query.where(Quiz.owner_id == owner_id)
+
+    quiz_row = db.execute(query).first()
+    if quiz_row is None:
+        return None
+
+    question_rows = db.execute(
+        select(*QUESTION_COLUMNS)
+        .where(Question.quiz_id == quiz_id)
+        .order_by(Question.order, Question.id)
+    ).all()
+
+    return quiz_row_to_dict(quiz_row, question_rows)
+
+
+def load_quiz_payloads(db: Session, quiz_ids: List[int]) -> List[Dict[str, Any]]:
+    """Load several quizzes with their questions in two queries, in quiz_ids order."""
+    if not quiz_ids:
+        return []
+
+    quizzes = {
+        row[0]: quiz_row_to_dict(row, [])
+        for row in db.execute(select(*QUIZ_COLUMNS).where(Quiz.id.in_(quiz_ids)))
+    }
+    for row in db.execute(
+        select(*QUESTION_COLUMNS)
+        .where(Question.quiz_id.in_(quiz_ids))
+        .order_by(Question.quiz_id, Question.order, Question.id)
+    ):
+        quizzes[row[1]]["questions"].append(question_row_to_dict(row))
+
+    return [quizzes[quiz_id] for quiz_id in quiz_ids if quiz_id in quizzes]
+
+
+def load_quiz_summaries(db: Session, owner_id: int, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    """Load quiz summaries with question counts in a single query."""
+    question_count = (
+        select(func.count(Question.id))
+        .where(Question.quiz_id == Quiz.id)
+        .correlate(Quiz)
+        .scalar_subquery()
+    )
+
+    rows = db.execute(
+        select(*QUIZ_COLUMNS, question_count)
+        .where(Quiz.owner_id == owner_id)
+        .order_by(Quiz.id)
+        .offset(skip)
+        .limit(limit)
+    ).all()
+
+    summaries = []
+    for row in rows:
+        summary = quiz_row_to_dict(row)
+        summary["question_count"] = row[7]
+        summaries.append(summary)
+    return summaries
@@ -0,0 +1,85 @@
+"""
+Read-optimized quiz snapshots.
+
+Every write path stores the quiz's full response document, already encoded as
+JSON bytes, in quiz_snapshots with a version that increases whenever the
+document changes. Rebuilding an unchanged quiz keeps its version, since the
+version also stamps which answer key buffered analytics were graded against.
+GET /api/quizzes/{id} then reads a single row by primary key and sends the
+bytes as they are, without touching the questions table or re-serializing.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import Quiz, QuizSnapshot
+from app.serialization import dumps, load_quiz_payloads
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def _upsert(db: Session):
+    dialect_insert = sqlite.insert if db.bind.dialect.name == "sqlite" else postgresql.insert
+    stmt = dialect_insert(QuizSnapshot)
+    table = QuizSnapshot.__table__
+    return stmt.on_conflict_do_update(
+        index_elements=["quiz_id"],
+        set_={
+            "owner_id": stmt.excluded.owner_id,
+            # Belge aynıysa (ör. backfill --all) sürüm artmaz
+            "version": case(
+                (table.c.document == stmt.excluded.document, table.c.version),
+                else_=table.c.version + 1
+            ),
+            "document": stmt.excluded.document,
+            "updated_at": stmt.excluded.updated_at,
+        }
+    )
+
+
+def _snapshot_row(quiz: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    return {
+        "quiz_id": quiz["id"],
+        "owner_id": quiz["owner_id"],
+        "version": 1,
+        "document": dumps(quiz),
+        "updated_at": now,
+    }
+
+
+def write_snapshot(db: Session, quiz: Dict[str, Any]) -> int:
+    """Store the snapshot of a quiz payload and return its new version; the caller commits."""
+    row = _snapshot_row(quiz, datetime.utcnow())
+    return db.execute(_upsert(db).values(row).returning(QuizSnapshot.version)).scalar_one()
+
+
+def write_snapshots(db: Session, quizzes: List[Dict[str, Any]]) -> None:
+    """Store snapshots of several quiz payloads in one statement; the caller commits."""
+    if quizzes:
+        now = datetime.utcnow()
+        db.execute(_upsert(db), [_snapshot_row(quiz, now) for quiz in quizzes])
+
+
+def load_snapshot(db: Session, quiz_id: int, owner_id: int) -> Optional[Tuple[bytes, int]]:
+    """Fetch (document, version) of a quiz by primary key, or None."""
+    row = db.execute(
+        select(QuizSnapshot.document, QuizSnapshot.version)
+        .where(QuizSnapshot.quiz_id == quiz_id, QuizSnapshot.owner_id == owner_id)
+    ).first()
+    return (bytes(row[0]), row[1]) if row is not None else None
+
+
+def backfill_snapshots(db: Session, rebuild_all: bool = False, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Build snapshots for quizzes that have none (or for all of them); returns the count."""
+    query = select(Quiz.id).order_by(Quiz.id)
+    if not rebuild_all:
+        query = query.outerjoin(QuizSnapshot, QuizSnapshot.quiz_id == Quiz.id).where(QuizSnapshot.quiz_id.is_(None))
+    quiz_ids = db.scalars(query).all()
+
+    for start in range(0, len(quiz_ids), batch_size):
+        write_snapshots(db, load_quiz_payloads(db, quiz_ids[start:start + batch_size]))
+        db.commit()
+    return len(quiz_ids)
@@ -0,0 +1,184 @@
+"""
+Streaming NDJSON export and import of quizzes.
+
+Export walks a server-side cursor over quizzes joined with their questions and
+emits one quiz per line. Import parses an NDJSON body line by line and
+bulk-inserts quizzes and questions in batches, reporting errors per line.
+"""
+from typing import Any, Dict, Iterator, List
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app import search
+from app.database import SessionLocal
+from app.models import Quiz, Question
+from app.question_bank import question_banks
+from app.schemas import QuizImport
+from app.serialization import (
+    QUESTION_COLUMNS, QUIZ_COLUMNS, dumps, load_quiz_payloads, quiz_row_to_dict, question_row_to_dict
+)
+from app.snapshots import write_snapshots
+
+EXPORT_YIELD_PER = 1000
+IMPORT_BATCH_QUESTIONS = 2000
+MAX_IMPORT_LINE_BYTES = 1024 * 1024
+MAX_REPORTED_ERRORS = 100
+
+
+def iter_export_lines(owner_id: int) -> Iterator[bytes]:
+    """Yield one NDJSON line per quiz of the owner, in constant memory."""
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(*QUIZ_COLUMNS, *QUESTION_COLUMNS)
+            .outerjoin(Question, Question.quiz_id == Quiz.id)
+            .where(Quiz.owner_id == owner_id)
+            .order_by(Quiz.id, Question.order, Question.id)
+            .execution_options(stream_results=True, yield_per=EXPORT_YIELD_PER)
+        )
+
+        quiz_width = len(QUIZ_COLUMNS)
+        current = None
+        for row in rows:
+            if current is None or current["id"] != row[0]:
+                if current is not None:
+                    yield dumps(current) + b"\n"
+                current = quiz_row_to_dict(row[:quiz_width], [])
+            if row[quiz_width] is not None:
+                current["questions"].append(question_row_to_dict(row[quiz_width:]))
+
+        if current is not None:
+            yield dumps(current) + b"\n"
+    finally:
+        db.close()
+
+
+class QuizImporter:
+    """Incremental NDJSON importer with batched bulk inserts."""
+
+    def __init__(self, db: Session, owner_id: int):
+        self.db = db
+        self.owner_id = owner_id
+        self.imported_quizzes = 0
+        self.imported_questions = 0
+        self.error_count = 0
+        self.errors: List[Dict[str, Any]] = []
+        self._line_number = 0
+        self._pending = b""
+        self._skipping = False
+        self._batch: List[QuizImport] = []
+        self._batch_questions = 0
+
+    def feed(self, chunk: bytes) -> bool:
+        """Consume a body chunk; returns True when a batch is ready to flush."""
+        data = self._pending + chunk
+        lines = data.split(b"\n")
+        self._pending = lines.pop()
+
+        for line in lines:
+            self._handle_line(line)
+
+        if len(self._pending) > MAX_IMPORT_LINE_BYTES:
+            # Satır sonu gelene kadar bu satırın geri kalanı atlanır
+            if not self._skipping:
+                self._line_number += 1
+                self._error(f"Line exceeds {MAX_IMPORT_LINE_BYTES} bytes")
+            self._skipping = True
+            self._pending = b""
+
+        return self._batch_questions >= IMPORT_BATCH_QUESTIONS
+
+    def finish(self) -> None:
+        """Handle the last unterminated line and flush what is left."""
+        if self._pending:
+            self._handle_line(self._pending)
+            self._pending = b""
+        self.flush()
+
+    def flush(self) -> None:
+        """Bulk-insert the current batch and commit it."""
+        if not self._batch:
+            return
+
+        batch, self._batch, self._batch_questions = self._batch, [], 0
+        db = self.db
+
+        quiz_ids = db.scalars(
+            insert(Quiz).returning(Quiz.id, sort_by_parameter_order=True),
+            [
+                {
+                    "title": quiz.title,
+                    "prompt": quiz.prompt,
+                    "category": quiz.category,
+                    "difficulty": quiz.difficulty,
+                    "owner_id": self.owner_id,
+                }
+                for quiz in batch
+            ]
+        ).all()
+
+        question_rows = [
+            {
+                "quiz_id": quiz_id,
+                "text": question.text,
+                "options": question.options,
+                "correct": question.correct,
+                "order": question.order if question.order is not None else order,
+            }
+            for quiz_id, quiz in zip(quiz_ids, batch)
+            for order, question in enumerate(quiz.questions)
+        ]
+        if question_rows:
+            db.execute(insert(Question), question_rows)
+
+        payloads = load_quiz_payloads(db, quiz_ids)
+        for payload in payloads:
+            search.index_quiz(db, payload)
+        write_snapshots(db, payloads)
+
+        db.commit()
+        for payload in payloads:
+            question_banks.add_quiz(payload)
+
+        self.imported_quizzes += len(batch)
+        self.imported_questions += len(question_rows)
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "imported_quizzes": self.imported_quizzes,
+            "imported_questions": self.imported_questions,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+    def _handle_line(self, line: bytes) -> None:
+        if self._skipping:
+            self._skipping = False
+            return
+
+        self._line_number += 1
+        line = line.strip()
+        if not line:
+            return
+
+        try:
+            quiz = QuizImport.model_validate(orjson.loads(line))
+        except orjson.JSONDecodeError as e:
+            self._error(f"Invalid JSON: {e}")
+            return
+        except ValidationError as e:
+            self._error("; ".join(
+                f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" for error in e.errors()
+            ))
+            return
+
+        self._batch.append(quiz)
+        self._batch_questions += max(len(quiz.questions), 1)
+
+    def _error(self, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": self._line_number, "error": message})
@@ -0,0 +1,198 @@
+"""
+LLM token usage and cost accounting.
+
+Each generation sums its LLM calls into a GenerationUsage (tokens, latency,
+models, whether sample questions had to fill in) that is stored as one
+generation_log row next to the quiz it produced. Failed attempts and hedge
+calls that lost the race are billed too; a losing call that stops after the
+row was written updates it in place. Cost is priced per call, since a hedged
+generation can span several models. Token counts reported by the provider are
+used when available; otherwise, and for checking prompt sizes before a
+request is sent, a local estimator approximates subword tokenization.
+"""
+import math
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import GenerationLog
+
+# Tahmin: noktalama işaretleri ayrı token, kelimeler ~4 karakterlik parçalar
+# (Türkçe eklemeli olduğu için uzun kelimeler birden fazla tokene bölünür)
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+CHARS_PER_TOKEN = 4
+
+# Sistem prompt'u şablonunun token bütçesi; aşılırsa prompt boyutunda gerileme var demektir
+SYSTEM_PROMPT_TOKEN_BUDGET = int(os.getenv("SYSTEM_PROMPT_TOKEN_BUDGET", "200"))
+PROMPT_TOKEN_LIMIT = int(os.getenv("PROMPT_TOKEN_LIMIT", "2000"))
+
+# Birden fazla modelin kullanıldığı üretimlerin model sütunu
+MIXED_MODELS = "mixed"
+
+# 1M token başına USD (girdi, çıktı)
+MODEL_PRICES = {
+    "gemini-1.5-flash-8b": (0.0375, 0.15),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-pro": (1.25, 5.00),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the token count of a text without a remote tokenizer."""
+    return sum(
+        max(1, math.ceil(len(match.group()) / CHARS_PER_TOKEN))
+        for match in TOKEN_PATTERN.finditer(text)
+    )
+
+
+def check_prompt_size(name: str, text: str, budget: int) -> int:
+    """Estimate a prompt's tokens and report if it exceeds its budget."""
+    tokens = estimate_tokens(text)
+    if tokens > budget:
+        print(f"Prompt size regression: {name} is ~{tokens} tokens, budget {budget}")
+    return tokens
+
+
+def estimate_cost(model: Optional[str], prompt_tokens: int, completion_tokens: int) -> float:
+    prices = MODEL_PRICES.get((model or "").split(":")[-1])
+    if prices is None:
+        return 0.0
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+class GenerationUsage:
+    """Token usage of one quiz generation, summed over its LLM calls."""
+    __slots__ = (
+        "llm_calls", "prompt_tokens", "completion_tokens", "estimated",
+        "latency", "models", "cost_usd", "fallback_used", "hedged",
+        "log_id", "_row_calls", "_lock"
+    )
+
+    def __init__(self):
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.estimated = False
+        self.latency = 0.0
+        self.models: List[str] = []
+        self.cost_usd = 0.0
+        self.fallback_used = False
+        self.hedged = False
+        # Kayıt yazıldıktan sonra gelen çağrılar bu satırı günceller
+        self.log_id: Optional[int] = None
+        self._row_calls = 0
+        # Yarışı kaybeden hedge çağrıları router'ın worker thread'lerinden eklenir
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> Optional[str]:
+        if len(self.models) > 1:
+            return MIXED_MODELS
+        return self.models[0] if self.models else None
+
+    def add(self, completion, prompt: str) -> None:
+        """Add one LLM call, estimating the token counts the provider did not report."""
+        prompt_tokens = (
+            completion.prompt_tokens if completion.prompt_tokens is not None else estimate_tokens(prompt)
+        )
+        completion_tokens = (
+            completion.completion_tokens if completion.completion_tokens is not None
+            else estimate_tokens("".join(completion.chunks))
+        )
+        model = f"{completion.provider}:{completion.model}"
+        with self._lock:
+            self.llm_calls += 1
+            self.latency += completion.latency
+            if model not in self.models:
+                self.models.append(model)
+            self.hedged = self.hedged or completion.hedged
+            if completion.prompt_tokens is None or completion.completion_tokens is None:
+                self.estimated = True
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            # Fiyat çağrı başına, o çağrının modeliyle hesaplanır
+            self.cost_usd += estimate_cost(completion.model, prompt_tokens, completion_tokens)
+            if self.log_id is not None:
+                self._update_log()
+
+    def _totals(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "llm_calls": self.llm_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "estimated": self.estimated,
+            "latency_ms": round(self.latency * 1000),
+            "hedged": self.hedged,
+            "cost_usd": self.cost_usd,
+        }
+
+    def _update_log(self) -> None:
+        with SessionLocal() as db:
+            db.execute(update(GenerationLog).where(GenerationLog.id == self.log_id).values(**self._totals()))
+            db.commit()
+
+    def to_row(self, user_id: int, quiz_id: Optional[int], question_count: int) -> Dict[str, Any]:
+        with self._lock:
+            self._row_calls = self.llm_calls
+            return {
+                "user_id": user_id,
+                "quiz_id": quiz_id,
+                "question_count": question_count,
+                "fallback_used": self.fallback_used,
+                "created_at": datetime.utcnow(),
+                **self._totals(),
+            }
+
+    def persisted(self, log_id: int) -> None:
+        """Remember the committed row so calls that finish later are added to it."""
+        with self._lock:
+            self.log_id = log_id
+            if self.llm_calls != self._row_calls:
+                self._update_log()
+
+
+def load_usage_report(db: Session, user_id: int, days: int) -> Dict[str, Any]:
+    """Per-day usage totals of a user over the last `days` days."""
+    since = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+    day = func.date(GenerationLog.created_at)
+    rows = db.execute(
+        select(
+            day,
+            func.count(GenerationLog.id),
+            func.sum(GenerationLog.llm_calls),
+            func.sum(GenerationLog.prompt_tokens),
+            func.sum(GenerationLog.completion_tokens),
+            func.sum(GenerationLog.cost_usd),
+            func.sum(case((GenerationLog.fallback_used, 1), else_=0)),
+            func.avg(GenerationLog.latency_ms),
+        )
+        .where(GenerationLog.user_id == user_id, GenerationLog.created_at >= since)
+        .group_by(day)
+        .order_by(day)
+    ).all()
+
+    report_days = [
+        {
+            "day": str(row[0]),
+            "generations": row[1],
+            "llm_calls": row[2] or 0,
+            "prompt_tokens": row[3] or 0,
+            "completion_tokens": row[4] or 0,
+            "cost_usd": row[5] or 0.0,
+            "fallbacks": row[6] or 0,
+            "avg_latency_ms": float(row[7] or 0),
+        }
+        for row in rows
+    ]
+    totals = {
+        key: sum(day_row[key] for day_row in report_days)
+        for key in ("generations", "llm_calls", "prompt_tokens", "completion_tokens", "cost_usd", "fallbacks")
+    }
+    return {"days": report_days, "totals": totals}
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark a class-sized burst of quiz attempt submissions against the app in-process.
+
+Usage: python benchmarks/bench_attempts.py [students]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_attempts.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.pop("GEMINI_API_KEY", None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import orjson
+
+from main import app
+from app.database import SessionLocal
+from app.grading import attempt_buffer
+from app.models import Attempt
+
+QUESTION_COUNT = 20
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+async def main(students: int):
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.post("/api/auth/register", json={
+                "name": "Bench", "email": "bench@example.com", "password": "benchpassword"
+            })
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            questions = [
+                {"text": f"Soru {i}", "options": ["a", "b", "c", "d"], "correct": i % 4}
+                for i in range(QUESTION_COUNT)
+            ]
+            await client.post("/api/quizzes/import", headers=headers, content=orjson.dumps(
+                {"title": "Bench", "prompt": "p", "questions": questions}
+            ))
+            quiz_id = (await client.get("/api/quizzes/", headers=headers)).json()["quizzes"][0]["id"]
+
+            async def submit(student):
+                answers = [(student + i) % 4 for i in range(QUESTION_COUNT)]
+                start = time.perf_counter()
+                response = await client.post(
+                    f"/api/quizzes/{quiz_id}/attempts", headers=headers, json={"answers": answers}
+                )
+                assert response.status_code == 200, response.text
+                return time.perf_counter() - start
+
+            start = time.perf_counter()
+            latencies = await asyncio.gather(*(submit(student) for student in range(students)))
+            elapsed = time.perf_counter() - start
+            await attempt_buffer.flush()
+
+    with SessionLocal() as db:
+        stored = db.query(Attempt).count()
+
+    print(f"students={students} total={elapsed:.2f}s stored={stored}")
+    print(f"latency p50={percentile(latencies, 0.5) * 1000:.1f}ms "
+          f"p95={percentile(latencies, 0.95) * 1000:.1f}ms p99={percentile(latencies, 0.99) * 1000:.1f}ms")
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
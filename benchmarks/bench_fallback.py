@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark the offline fallback: template corpus lookups for a mix of quiz topics.
+
+Reports lookup throughput and how many requested questions came from the
+templates instead of "Seçenek A" placeholders.
+
+Usage: python benchmarks/bench_fallback.py [lookups]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.fallback import fallback_templates
+
+QUESTION_COUNT = 10
+
+TOPICS = [
+    ("Matematik", "Temel işlemler ve denklemler", "easy"),
+    ("MATEMATİĞİN Temelleri", None, "medium"),
+    ("Osmanlı Tarihi", "Kuruluştan Tanzimat'a", "medium"),
+    ("Cografya", "Türkiye'nin iklimi ve akarsuları", "easy"),
+    ("Kuvvet ve Hareket", "Lise fiziği", "hard"),
+    ("Kimyasal Tepkimeler", None, "medium"),
+    ("Hücre Biyolojisi", "Hücre ve organeller", "hard"),
+    ("Türk Edebiyatı", "Roman ve şiir", "medium"),
+    ("İngilizce Gramer", "Tenses", "easy"),
+    ("Python Programlama", "Veri yapıları ve algoritmalar", "hard"),
+    ("Güneş Sistemi", "Gezegenler", "easy"),
+    ("Yemek Tarifleri", "Mutfak kültürü", "medium"),
+]
+
+def main(lookups: int):
+    start = time.perf_counter()
+    fallback_templates.load()
+    load_ms = (time.perf_counter() - start) * 1000
+
+    filled = 0
+    start = time.perf_counter()
+    for i in range(lookups):
+        title, prompt, difficulty = TOPICS[i % len(TOPICS)]
+        filled += len(fallback_templates.questions_for(QUESTION_COUNT, title, prompt, difficulty=difficulty))
+    elapsed = time.perf_counter() - start
+
+    requested = lookups * QUESTION_COUNT
+    print(f"corpus v{fallback_templates.version}: {len(fallback_templates)} questions, loaded in {load_ms:.1f} ms")
+    print(f"lookups={lookups} questions/lookup={QUESTION_COUNT} total={elapsed:.3f}s "
+          f"throughput={lookups / elapsed:,.0f} lookups/s mean={elapsed / lookups * 1e6:.1f} µs")
+    print(f"template questions: {filled}/{requested} ({filled / requested:.0%}), "
+          f"placeholders: {requested - filled}")
+
+    print(f"{'topic':<24} {'matched':<12} {'filled':>6}")
+    for title, prompt, difficulty in TOPICS:
+        topics = fallback_templates.match(title, prompt)
+        count = len(fallback_templates.questions_for(QUESTION_COUNT, title, prompt, difficulty=difficulty))
+        print(f"{title:<24} {(topics[0].topic_id if topics else '-'):<12} {count:>6}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
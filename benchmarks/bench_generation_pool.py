@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Load test: a burst of quiz generations against a slow LLM, sampling DB pool usage.
+
+The LLM router is pointed at the local provider with a simulated latency, so
+the test measures how many pooled connections are checked out while
+generations are waiting on the model (it should stay flat, near zero).
+
+Usage: python benchmarks/bench_generation_pool.py [generations] [llm_seconds]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_generation_pool.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from main import app
+from app.database import SessionLocal, engine
+from app.llm_router import DEFAULT, LocalProvider, llm_router
+from app.models import Quiz
+
+QUESTION_COUNT = 5
+SAMPLE_INTERVAL = 0.01
+TIMELINE_BUCKET = 0.25
+
+async def main(generations: int, llm_seconds: float):
+    llm_router.set_providers({DEFAULT: LocalProvider(delay=llm_seconds)})
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            response = await client.post("/api/auth/register", json={
+                "name": "Bench", "email": "bench@example.com", "password": "benchpassword"
+            })
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            samples = []
+            done = asyncio.Event()
+
+            async def sample_pool():
+                while not done.is_set():
+                    samples.append((time.perf_counter() - start, engine.pool.checkedout()))
+                    await asyncio.sleep(SAMPLE_INTERVAL)
+
+            async def generate(index):
+                response = await client.post("/api/quizzes/generate", headers=headers, json={
+                    "title": f"Bench {index}", "prompt": "p", "question_count": QUESTION_COUNT
+                })
+                assert response.status_code == 200, response.text
+                return len(response.json()["questions"])
+
+            start = time.perf_counter()
+            sampler = asyncio.create_task(sample_pool())
+            counts = await asyncio.gather(*(generate(index) for index in range(generations)))
+            elapsed = time.perf_counter() - start
+            done.set()
+            await sampler
+
+    with SessionLocal() as db:
+        stored = db.query(Quiz).count()
+
+    pool_limit = engine.pool.size() + engine.pool._max_overflow
+    values = [value for _, value in samples]
+    print(f"generations={generations} llm={llm_seconds:.1f}s total={elapsed:.2f}s "
+          f"stored={stored} questions={sum(counts)}")
+    print(f"pool checked out: peak={max(values)} mean={sum(values) / len(values):.2f} "
+          f"limit={pool_limit} samples={len(values)}")
+
+    # Zaman dilimi başına en yüksek kullanım: kısa auth ve kayıt anları dışında sıfır olmalı
+    timeline = {}
+    for offset, value in samples:
+        bucket = int(offset / TIMELINE_BUCKET)
+        timeline[bucket] = max(timeline.get(bucket, 0), value)
+    for bucket, value in sorted(timeline.items()):
+        print(f"  {bucket * TIMELINE_BUCKET:5.2f}s {'#' * value} {value}")
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 30,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    ))
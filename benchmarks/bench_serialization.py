@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark quiz response serialization: pydantic + stdlib json vs row tuples + orjson.
+
+Usage: python benchmarks/bench_serialization.py
+"""
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.schemas import Quiz as QuizSchema
+from app.serialization import dumps, quiz_row_to_dict
+
+SIZES = [10, 100, 1000]
+
+def build_rows(question_count):
+    """Build quiz/question row tuples like the ones returned by the DB."""
+    now = datetime.now(timezone.utc)
+    quiz_row = (1, "Matematik Temel Kavramlar", "Lise seviyesinde sorular", "Matematik", "medium", 1, now)
+    question_rows = [
+        (i + 1, 1, f"{i + 1}. soru metni burada", ["3", "5", "7", "10"], i % 4, i, now)
+        for i in range(question_count)
+    ]
+    return quiz_row, question_rows
+
+def build_orm_object(quiz_row, question_rows):
+    """Build attribute-style objects equivalent to loaded ORM instances."""
+    questions = [
+        SimpleNamespace(id=r[0], quiz_id=r[1], text=r[2], options=r[3], correct=r[4], order=r[5], created_at=r[6])
+        for r in question_rows
+    ]
+    return SimpleNamespace(
+        id=quiz_row[0], title=quiz_row[1], prompt=quiz_row[2], category=quiz_row[3],
+        difficulty=quiz_row[4], owner_id=quiz_row[5], created_at=quiz_row[6], questions=questions
+    )
+
+def old_path(quiz):
+    """response_model validation followed by the stdlib json encoder."""
+    model = QuizSchema.model_validate(quiz)
+    return json.dumps(model.model_dump(mode="json"), ensure_ascii=False).encode("utf-8")
+
+def new_path(quiz_row, question_rows):
+    """Row tuples straight to a dict, encoded with orjson."""
+    return dumps(quiz_row_to_dict(quiz_row, question_rows))
+
+def main():
+    print(f"{'questions':>10} {'old (ms)':>10} {'new (ms)':>10} {'speedup':>8}")
+    for size in SIZES:
+        quiz_row, question_rows = build_rows(size)
+        quiz = build_orm_object(quiz_row, question_rows)
+        number = max(1, 2000 // size)
+
+        old = min(timeit.repeat(lambda: old_path(quiz), number=number, repeat=5)) / number
+        new = min(timeit.repeat(lambda: new_path(quiz_row, question_rows), number=number, repeat=5)) / number
+        print(f"{size:>10} {old * 1000:>10.3f} {new * 1000:>10.3f} {old / new:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,35 @@ from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
 
-from app.database import create_tables
-from app.routers import auth, quizzes
+from app.database import SessionLocal, create_tables, engine, warm_pool
+from app.search import ensure_search_index
+from app.fallback import fallback_templates
+from app.routers import auth, quizzes, attempts, live, usage
+from app.grading import answer_keys, attempt_buffer
+from app.revocation import session_denylist
+from app.llm_router import llm_router
 
 load_dotenv()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup: istekler kabul edilmeden önce havuz, önbellekler ve LLM istemcisi hazırlanır
     create_tables()
+    connections = warm_pool()
+    with SessionLocal() as db:
+        ensure_search_index(engine, db)
+        keys = answer_keys.prime(db)
+        session_denylist.load(db)
+    fallback_templates.load()
+    llm_ready = llm_router.warm_up()
+    attempt_buffer.start()
+    session_denylist.start()
+    print(f"Worker {os.getpid()} ready: {connections} DB connections, {keys} answer keys, LLM {'on' if llm_ready else 'off'}")
     yield
-    # Shutdown
+    # Shutdown: sunucu devam eden istekleri bitirdikten sonra buraya gelir
+    await session_denylist.stop()
+    await attempt_buffer.stop()
+    engine.dispose()
 
 app = FastAPI(
     title="AI Quiz Builder API",
@@ -35,6 +53,9 @@ app.add_middleware(
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(quizzes.router, prefix="/api/quizzes", tags=["quizzes"])
+app.include_router(attempts.router, prefix="/api/quizzes", tags=["attempts"])
+app.include_router(live.router, prefix="/api/live", tags=["live"])
+app.include_router(usage.router, prefix="/api/usage", tags=["usage"])
 
 @app.get("/")
 async def root():
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for AI Quiz Builder API
+
+Usage: python manage.py <command>
+"""
+import argparse
+import sys
+
+from app.database import SessionLocal, create_tables
+import app.models  # noqa: F401  Tabloların create_tables'tan önce tanımlı olması için
+
+def rebuild_analytics(args):
+    """Recompute quiz/question analytics from raw attempts."""
+    from app.analytics import rebuild_analytics as rebuild
+
+    with SessionLocal() as db:
+        count = rebuild(db)
+    print(f"Analytics rebuilt from {count} attempts")
+
+def purge_tokens(args):
+    """Delete expired refresh tokens."""
+    from app.auth import purge_expired_refresh_tokens
+
+    with SessionLocal() as db:
+        count = purge_expired_refresh_tokens(db)
+    print(f"Purged {count} expired refresh tokens")
+
+def purge_idempotency_keys(args):
+    """Delete expired idempotency keys."""
+    from app.idempotency import purge_expired_keys
+
+    with SessionLocal() as db:
+        count = purge_expired_keys(db)
+    print(f"Purged {count} expired idempotency keys")
+
+def prompt_size(args):
+    """Report estimated prompt tokens against their budgets; fails on a regression."""
+    from app.routers.quizzes import build_system_prompt, build_user_prompt
+    from app.usage import PROMPT_TOKEN_LIMIT, SYSTEM_PROMPT_TOKEN_BUDGET, check_prompt_size
+
+    regressed = False
+    for difficulty in ("easy", "medium", "hard"):
+        system_prompt = build_system_prompt(difficulty)
+        user_prompt = build_user_prompt("Örnek konu", "Örnek açıklama", 10, difficulty, "Genel")
+        system_tokens = check_prompt_size(f"system prompt ({difficulty})", system_prompt, SYSTEM_PROMPT_TOKEN_BUDGET)
+        total_tokens = check_prompt_size("generation prompt", f"{system_prompt}\n\n{user_prompt}", PROMPT_TOKEN_LIMIT)
+        print(f"{difficulty}: system ~{system_tokens}/{SYSTEM_PROMPT_TOKEN_BUDGET} tokens, "
+              f"total ~{total_tokens}/{PROMPT_TOKEN_LIMIT} tokens")
+        regressed = regressed or system_tokens > SYSTEM_PROMPT_TOKEN_BUDGET or total_tokens > PROMPT_TOKEN_LIMIT
+    if regressed:
+        sys.exit(1)
+
+def backfill_snapshots(args):
+    """Build read snapshots for quizzes that have none (--all rebuilds every quiz)."""
+    from app.snapshots import backfill_snapshots as backfill
+
+    with SessionLocal() as db:
+        count = backfill(db, rebuild_all=args.all)
+    print(f"Built snapshots for {count} quizzes")
+
+COMMANDS = {
+    "rebuild-analytics": rebuild_analytics,
+    "purge-tokens": purge_tokens,
+    "purge-idempotency-keys": purge_idempotency_keys,
+    "prompt-size": prompt_size,
+    "backfill-snapshots": backfill_snapshots,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI Quiz Builder maintenance commands")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--all", action="store_true", help="backfill-snapshots: rebuild every snapshot")
+    args = parser.parse_args()
+
+    create_tables()
+    COMMANDS[args.command](args)
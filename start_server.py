@@ -1,18 +1,114 @@
 #!/usr/bin/env python3
 """
-Development server startup script for AI Quiz Builder API
+Server startup script for AI Quiz Builder API
+
+    python start_server.py                # development (auto-reload)
+    python start_server.py --production   # multi-worker production server
 """
-import uvicorn
+import argparse
 import os
 
-if __name__ == "__main__":
+import uvicorn
+
+def default_workers() -> int:
+    """One worker per CPU core available to this process."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    return max(cores, 1)
+
+def production_settings() -> dict:
+    """Production server settings, overridable from the environment."""
+    return {
+        "host": os.getenv("HOST", "0.0.0.0"),
+        "port": int(os.getenv("PORT", "8000")),
+        "workers": int(os.getenv("WEB_CONCURRENCY", default_workers())),
+        # Yük dengeleyicinin boşta bağlantı süresinden uzun tutulmalı
+        "keep_alive": int(os.getenv("KEEP_ALIVE", "75")),
+        "backlog": int(os.getenv("BACKLOG", "2048")),
+        # Devam eden quiz üretimlerinin bitmesi için kapanışta beklenen süre
+        "graceful_timeout": int(os.getenv("GRACEFUL_TIMEOUT", "120")),
+        "preload": os.getenv("PRELOAD", "True").lower() in ("1", "true", "yes"),
+    }
+
+def prepare_database():
+    """Create the schema once in the parent so workers don't race on DDL."""
+    from app.database import SessionLocal, create_tables, engine
+    from app.search import ensure_search_index
+
+    create_tables()
+    with SessionLocal() as db:
+        ensure_search_index(engine, db)
+    engine.dispose()
+
+def run_development():
     # Set development environment
     os.environ.setdefault("DEBUG", "True")
-    
+
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
         reload=True,
         log_level="info"
-    ) 
\ No newline at end of file
+    )
+
+def run_gunicorn(settings: dict):
+    """Run under gunicorn so the app is imported once before forking workers."""
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{settings['host']}:{settings['port']}")
+            self.cfg.set("workers", settings["workers"])
+            self.cfg.set("worker_class", "uvicorn.workers.UvicornWorker")
+            self.cfg.set("keepalive", settings["keep_alive"])
+            self.cfg.set("backlog", settings["backlog"])
+            self.cfg.set("graceful_timeout", settings["graceful_timeout"])
+            self.cfg.set("timeout", settings["graceful_timeout"])
+            self.cfg.set("preload_app", True)
+
+        def load(self):
+            from main import app
+            return app
+
+    Application().run()
+
+def run_production(settings: dict):
+    os.environ.setdefault("DEBUG", "False")
+    prepare_database()
+
+    if settings["preload"]:
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            print("gunicorn is not installed, starting uvicorn workers without preload")
+        else:
+            run_gunicorn(settings)
+            return
+
+    uvicorn.run(
+        "main:app",
+        host=settings["host"],
+        port=settings["port"],
+        workers=settings["workers"],
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=settings["keep_alive"],
+        backlog=settings["backlog"],
+        timeout_graceful_shutdown=settings["graceful_timeout"],
+        proxy_headers=True,
+        access_log=False,
+        log_level="info"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Start the AI Quiz Builder API server")
+    parser.add_argument("--production", action="store_true", help="multi-worker server without auto-reload")
+    args = parser.parse_args()
+
+    if args.production:
+        run_production(production_settings())
+    else:
+        run_development()
@@ -0,0 +1,33 @@
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+# Testler izlenen ai_quiz_builder.db yerine geçici bir veritabanı kullanır
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+os.environ.pop("GEMINI_API_KEY", None)
+os.environ.pop("LLM_PROVIDER", None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    import main
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def register(client):
+    """Register a fresh user and return their auth headers."""
+    def _register(name: str) -> dict:
+        email = f"{name.lower()}-{uuid.uuid4().hex[:12]}@example.com"
+        response = client.post("/api/auth/register", json={"name": name, "email": email, "password": "password123"})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return _register
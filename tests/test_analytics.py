@@ -0,0 +1,88 @@
+from sqlalchemy import select
+
+from app.analytics import AnalyticsDelta
+from app.database import SessionLocal
+from app.grading import load_answer_key
+from app.models import QuestionStats, QuizStats
+from app.snapshots import backfill_snapshots
+
+QUESTIONS = [{"text": f"Soru {i}?", "options": ["a", "b", "c", "d"], "correct": 1} for i in range(3)]
+
+
+def create_quiz(client, headers):
+    quiz = client.post("/api/quizzes/", headers=headers, json={"title": "Tarih", "prompt": "p", "question_count": 3})
+    quiz_id = quiz.json()["id"]
+    response = client.put(f"/api/quizzes/{quiz_id}", headers=headers, json={
+        "title": "Tarih", "prompt": "p", "questions": QUESTIONS
+    })
+    assert response.status_code == 200, response.text
+    return quiz_id
+
+
+def graded_delta(key):
+    delta = AnalyticsDelta()
+    answers = [1, 0, None]
+    flags = [int(answer == 1) for answer in answers]
+    delta.record(key.quiz_id, key.question_ids, answers, flags, sum(flags), key.version)
+    return delta
+
+
+def question_attempts(db, quiz_id):
+    return sum(db.scalars(select(QuestionStats.attempts).where(QuestionStats.quiz_id == quiz_id)))
+
+
+def test_delta_for_edited_quiz_skips_question_stats(client, register):
+    headers = register("Teacher")
+    quiz_id = create_quiz(client, headers)
+    with SessionLocal() as db:
+        delta = graded_delta(load_answer_key(db, quiz_id))
+
+    # Doğru cevaplar değişir; SQLite silinen soruların id'lerini yeni sorulara verebilir
+    edited = [dict(question, correct=2) for question in QUESTIONS]
+    client.put(f"/api/quizzes/{quiz_id}", headers=headers, json={"title": "Tarih", "prompt": "p", "questions": edited})
+
+    with SessionLocal() as db:
+        delta.apply(db)
+        db.commit()
+        assert db.get(QuizStats, quiz_id).attempts == 1
+        assert question_attempts(db, quiz_id) == 0
+
+
+def test_delta_for_unchanged_quiz_is_applied(client, register):
+    headers = register("Teacher")
+    quiz_id = create_quiz(client, headers)
+    with SessionLocal() as db:
+        delta = graded_delta(load_answer_key(db, quiz_id))
+        delta.apply(db)
+        db.commit()
+        assert question_attempts(db, quiz_id) == 3
+
+
+def test_snapshot_rebuild_keeps_key_version(client, register):
+    headers = register("Teacher")
+    quiz_id = create_quiz(client, headers)
+    with SessionLocal() as db:
+        key = load_answer_key(db, quiz_id)
+        delta = graded_delta(key)
+
+        # backfill-snapshots --all aynı belgeyi yeniden yazar; sürüm değişmemeli
+        assert backfill_snapshots(db, rebuild_all=True) >= 1
+        assert load_answer_key(db, quiz_id).version == key.version
+        delta.apply(db)
+        db.commit()
+        assert question_attempts(db, quiz_id) == 3
+
+
+def test_newer_key_version_replaces_buffered_question_counters():
+    delta = AnalyticsDelta()
+    delta.record(1, [10, 11], [0, 1], [1, 1], 2, version=1)
+    delta.record(1, [10, 11], [None, 1], [0, 1], 1, version=2)
+    assert delta.quizzes[1][0] == 2
+    assert delta.questions[10][1:] == [1, 0, 1]
+    assert (10, 0) not in delta.options
+
+    older = AnalyticsDelta()
+    older.record(1, [10, 11], [0, 1], [1, 1], 2, version=1)
+    delta.merge(older)
+    assert delta.quizzes[1][0] == 3
+    assert delta.questions[10][1:] == [1, 0, 1]
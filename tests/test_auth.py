@@ -0,0 +1,96 @@
+import uuid
+
+from jose import jwt
+from sqlalchemy import func, select
+
+from app.auth import ALGORITHM, SECRET_KEY
+from app.database import SessionLocal
+from app.models import RevokedSession
+from app.revocation import BloomFilter, SessionDenylist
+
+
+def login(client):
+    email = f"user-{uuid.uuid4().hex[:12]}@example.com"
+    response = client.post("/api/auth/register", json={"name": "User", "email": email, "password": "password123"})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def session_id(tokens):
+    return jwt.decode(tokens["access_token"], SECRET_KEY, algorithms=[ALGORITHM])["sid"]
+
+
+def me(client, tokens):
+    return client.get("/api/auth/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+
+
+def refresh(client, tokens):
+    return client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+
+def revocations(sid):
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).select_from(RevokedSession).where(RevokedSession.session_id == sid))
+
+
+def test_refresh_rotates_tokens_within_the_session(client):
+    tokens = login(client)
+    response = refresh(client, tokens)
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    assert session_id(rotated) == session_id(tokens)
+    assert me(client, rotated).status_code == 200
+    assert refresh(client, rotated).status_code == 200
+
+
+def test_replayed_refresh_token_revokes_the_session(client):
+    tokens = login(client)
+    rotated = refresh(client, tokens).json()
+
+    assert refresh(client, tokens).status_code == 401
+    # Çalınmış olabilecek token'ın tekrarı tüm oturumu iptal eder
+    assert refresh(client, rotated).status_code == 401
+    assert me(client, rotated).status_code == 401
+    assert me(client, tokens).status_code == 401
+
+    for _ in range(3):
+        assert refresh(client, tokens).status_code == 401
+    assert revocations(session_id(tokens)) == 1
+
+
+def test_logout_rejects_the_access_token(client):
+    tokens = login(client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.post("/api/auth/logout", headers=headers).status_code == 200
+    assert me(client, tokens).status_code == 401
+    assert refresh(client, tokens).status_code == 401
+    assert revocations(session_id(tokens)) == 1
+
+    # Başka bir oturum etkilenmez
+    assert me(client, login(client)).status_code == 200
+
+
+def test_other_workers_pick_up_revocations_on_sync(client):
+    tokens = login(client)
+    worker = SessionDenylist()
+    with SessionLocal() as db:
+        worker.sync(db)
+    assert not worker.is_revoked(session_id(tokens))
+
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.post("/api/auth/logout", headers=headers).status_code == 200
+    with SessionLocal() as db:
+        assert worker.sync(db) == 1
+        assert worker.sync(db) == 0
+    assert worker.is_revoked(session_id(tokens))
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=100)
+    items = [uuid.uuid4().hex for _ in range(100)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(1000))
+    assert false_positives < 50
@@ -0,0 +1,12 @@
+from sqlalchemy import inspect, text
+
+from app.database import engine, ensure_indexes
+
+
+def test_missing_declared_index_is_created_on_startup(client):
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_questions_quiz_id"))
+
+    assert ensure_indexes() == ["ix_questions_quiz_id"]
+    assert "ix_questions_quiz_id" in {index["name"] for index in inspect(engine).get_indexes("questions")}
+    assert ensure_indexes() == []
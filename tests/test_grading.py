@@ -0,0 +1,56 @@
+from app.grading import AnswerKey
+
+
+def test_grade_counts_matching_answers():
+    key = AnswerKey(1, 1, [1, 2, 3], [0, 2, 3])
+    score, flags = key.grade([0, 1, 3])
+    assert score == 2
+    assert list(flags) == [1, 0, 1]
+
+
+def test_blank_answer_never_matches_invalid_key():
+    key = AnswerKey(1, 1, [1, 2], [-1, 1])
+    assert key.grade([None, 1])[0] == 1
+    assert key.grade([-1, 1])[0] == 1
+    assert key.grade([254, 1])[0] == 1
+
+
+def test_out_of_range_keys_and_answers():
+    key = AnswerKey(1, 1, [1, 2, 3], [300, 254, 255])
+    assert key.grade([None, None, None])[0] == 0
+    assert key.grade([300, 254, 255])[0] == 0
+
+
+def test_missing_answers_are_blank():
+    key = AnswerKey(1, 1, [1, 2], [1, 1])
+    assert key.grade([1])[0] == 1
+
+
+def test_out_of_range_correct_is_rejected_on_write(client, register):
+    headers = register("Teacher")
+    quiz = client.post("/api/quizzes/", headers=headers, json={"title": "Tarih", "prompt": "p", "question_count": 1})
+    quiz_id = quiz.json()["id"]
+    for correct in (-1, 4):
+        response = client.put(f"/api/quizzes/{quiz_id}", headers=headers, json={
+            "title": "Tarih", "prompt": "p",
+            "questions": [{"text": "Soru?", "options": ["a", "b", "c", "d"], "correct": correct}],
+        })
+        assert response.status_code == 422, response.text
+
+
+def test_attempts_on_another_users_quiz_are_not_found(client, register):
+    owner = register("Owner")
+    other = register("Other")
+    quiz_id = client.post("/api/quizzes/", headers=owner, json={
+        "title": "Tarih", "prompt": "p", "question_count": 2
+    }).json()["id"]
+    assert client.get(f"/api/quizzes/{quiz_id}", headers=other).status_code == 404
+
+    for path, body in (("attempts", {"answers": [0, 0]}), ("attempts/batch", {"submissions": [{"answers": [0, 0]}]})):
+        response = client.post(f"/api/quizzes/{quiz_id}/{path}", headers=other, json=body)
+        assert response.status_code == 404
+        assert "results" not in response.text
+
+    response = client.post(f"/api/quizzes/{quiz_id}/attempts", headers=owner, json={"answers": [0, 0]})
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 2
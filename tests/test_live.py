@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import update
+from starlette.websockets import WebSocketDisconnect
+
+from app.database import SessionLocal
+from app.live import live_answer_key
+from app.models import Question
+
+
+def _quiz(correct):
+    return {
+        "id": 1, "owner_id": 1,
+        "questions": [{"id": 1, "text": "Soru?", "options": ["a", "b", "c"], "correct": correct}],
+    }
+
+
+def test_live_answer_key_rejects_unusable_answers():
+    assert live_answer_key(_quiz(2)).key == bytes([2])
+    for correct in (-1, 3, 300, None):
+        assert live_answer_key(_quiz(correct)) is None
+
+
+def test_host_is_refused_for_quiz_with_invalid_answer(client, register):
+    headers = register("Host")
+    quiz_id = client.post("/api/quizzes/", headers=headers, json={
+        "title": "Tarih", "prompt": "p", "question_count": 1
+    }).json()["id"]
+    with SessionLocal() as db:
+        db.execute(update(Question).where(Question.quiz_id == quiz_id).values(correct=300))
+        db.commit()
+
+    token = headers["Authorization"].split()[1]
+    with pytest.raises(WebSocketDisconnect) as excinfo:
+        with client.websocket_connect(f"/api/live/host/{quiz_id}?token={token}") as websocket:
+            websocket.receive_text()
+    assert excinfo.value.code == 1008
+    assert excinfo.value.reason == "Quiz has questions without a valid answer"
+
+
+def test_host_session_starts_for_valid_quiz(client, register):
+    headers = register("Host")
+    quiz_id = client.post("/api/quizzes/", headers=headers, json={
+        "title": "Tarih", "prompt": "p", "question_count": 1
+    }).json()["id"]
+
+    token = headers["Authorization"].split()[1]
+    with client.websocket_connect(f"/api/live/host/{quiz_id}?token={token}") as websocket:
+        assert websocket.receive_json()["type"] == "session"
+        websocket.send_json({"action": "next"})
+        assert websocket.receive_json()["type"] == "question"
+        websocket.send_json({"action": "reveal"})
+        message = websocket.receive_json()
+        assert message["type"] == "results"
+        assert isinstance(message["correct"], int)
@@ -0,0 +1,52 @@
+import json
+
+from app.llm_parser import QuestionStreamParser, parse_questions
+
+
+def question(text, options=("A", "B", "C", "D"), correct=0):
+    return {"text": text, "options": list(options), "correct": correct}
+
+
+def reply(*questions):
+    return json.dumps({"questions": list(questions)}, ensure_ascii=False)
+
+
+def test_prose_before_json():
+    content = "Here are \"5 questions:\n```json\n" + reply(question("Soru 1?"), question("Soru 2?")) + "\n```"
+    assert [q["text"] for q in parse_questions(content)] == ["Soru 1?", "Soru 2?"]
+
+
+def test_prose_quotes_split_across_chunks():
+    parser = QuestionStreamParser()
+    content = 'İşte "sorular: ' + reply(question("Soru 1?"), question("Soru 2?"))
+    completed = []
+    for start in range(0, len(content), 7):
+        completed += parser.feed(content[start:start + 7])
+    assert [q["text"] for q in completed] == ["Soru 1?", "Soru 2?"]
+
+
+def test_truncated_final_object():
+    content = reply(question("Soru 1?"), question("Soru 2?"))
+    truncated = content[:content.index("Soru 2?") + 10]
+    assert [q["text"] for q in parse_questions(truncated)] == ["Soru 1?"]
+
+
+def test_duplicate_questions():
+    parser = QuestionStreamParser(seen_texts=["Önceki  soru?"])
+    parser.feed(reply(question("Soru 1?"), question("soru 1?"), question("Önceki soru?")))
+    assert [q["text"] for q in parser.questions] == ["Soru 1?"]
+    assert parser.rejected == 2
+
+
+def test_non_distinct_options():
+    parser = QuestionStreamParser()
+    parser.feed(reply(question("Soru 1?", options=("A", "A", "C", "D")), question("Soru 2?")))
+    assert [q["text"] for q in parser.questions] == ["Soru 2?"]
+    assert parser.rejected == 1
+
+
+def test_out_of_range_correct():
+    parser = QuestionStreamParser()
+    parser.feed(reply(question("Soru 1?", correct=4), question("Soru 2?", correct=-1), question("Soru 3?", correct=3)))
+    assert [(q["text"], q["correct"]) for q in parser.questions] == [("Soru 3?", 3)]
+    assert parser.rejected == 2
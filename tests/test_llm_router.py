@@ -0,0 +1,69 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.llm_router import DEFAULT, FAST, MIN_HEDGE_SAMPLES, GenerationRequest, LLMRouter, LocalProvider
+from app.database import SessionLocal
+from app.models import GenerationLog
+from app.usage import MIXED_MODELS, estimate_cost
+
+
+def _request(index: int) -> GenerationRequest:
+    return GenerationRequest(f"istek {index}", "Tarih", "p", 3, "easy")
+
+
+def test_queued_requests_are_not_hedged_below_p95():
+    fast = LocalProvider("fast", delay=0.05)
+    router = LLMRouter({FAST: fast, DEFAULT: LocalProvider("default")}, workers=4)
+    for _ in range(MIN_HEDGE_SAMPLES):
+        router.profiles[fast.key].record(0.3, True)
+
+    # 32 istek 4 worker'da sıraya girer; kuyruk süresi p95'i aşsa da çağrılar p95'ten hızlıdır
+    with ThreadPoolExecutor(max_workers=32) as callers:
+        completions = list(callers.map(router.complete, [_request(index) for index in range(32)]))
+
+    assert all(completion.error is None for completion in completions)
+    assert not any(completion.hedged for completion in completions)
+    assert {completion.model for completion in completions} == {"fast"}
+
+
+def test_slow_primary_is_hedged():
+    slow = LocalProvider("slow", delay=0.5)
+    router = LLMRouter({FAST: slow, DEFAULT: LocalProvider("default")}, workers=4)
+    for _ in range(MIN_HEDGE_SAMPLES):
+        router.profiles[slow.key].record(0.05, True)
+
+    completion = router.complete(_request(0))
+    assert completion.hedged
+    assert completion.model == "default"
+
+
+def test_losing_hedge_is_billed_in_the_generation_log(client, register, monkeypatch):
+    from app.routers import quizzes
+
+    # Kaybeden çağrı, generation_log satırı yazıldıktan sonra durur
+    slow = LocalProvider("gemini-1.5-pro", delay=1.0, chunk_size=1 << 20)
+    router = LLMRouter({FAST: slow, DEFAULT: LocalProvider("gemini-1.5-flash")}, workers=4)
+    for _ in range(MIN_HEDGE_SAMPLES):
+        router.profiles[slow.key].record(0.05, True)
+    monkeypatch.setattr(quizzes, "llm_router", router)
+
+    headers = register("Teacher")
+    quiz_id = client.post("/api/quizzes/", headers=headers, json={
+        "title": "Tarih", "prompt": "p", "question_count": 3
+    }).json()["id"]
+
+    def load_row():
+        with SessionLocal() as db:
+            return db.query(GenerationLog).filter(GenerationLog.quiz_id == quiz_id).one()
+
+    assert load_row().llm_calls == 1
+    deadline = time.monotonic() + 5
+    while load_row().llm_calls < 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    row = load_row()
+    assert row.llm_calls == 2
+    assert row.model == MIXED_MODELS
+    assert row.hedged
+    assert row.latency_ms >= 1000
+    assert row.cost_usd > estimate_cost("gemini-1.5-flash", row.prompt_tokens, row.completion_tokens)
@@ -0,0 +1,76 @@
+import json
+
+from app.llm_router import llm_router
+from app.question_bank import QuestionBank
+
+PRIVATE_TEXTS = ["GIZLI SORU A kimya atom numarası?", "GIZLI SORU B kimya atom kütlesi?"]
+
+
+def import_quiz(client, headers, texts):
+    line = json.dumps({
+        "title": "Kimya atom",
+        "prompt": "kimya atom",
+        "category": "Kimya",
+        "questions": [{"text": text, "options": ["1", "2", "3", "4"], "correct": 1} for text in texts],
+    })
+    response = client.post("/api/quizzes/import", content=line + "\n", headers=headers)
+    assert response.json()["imported_quizzes"] == 1, response.text
+
+
+def generate(client, headers, use_question_bank):
+    response = client.post("/api/quizzes/generate", headers=headers, json={
+        "title": "Kimya atom", "prompt": "kimya atom", "category": "Kimya",
+        "question_count": 4, "use_question_bank": use_question_bank,
+    })
+    assert response.status_code == 200, response.text
+    return [question["text"] for question in response.json()["questions"]]
+
+
+def test_users_never_see_each_others_questions(client, register):
+    assert not llm_router.available
+    alice, bob = register("Alice"), register("Bob")
+    import_quiz(client, alice, PRIVATE_TEXTS)
+    import_quiz(client, bob, ["BOB SORUSU kimya atom yarıçapı?"])
+
+    for use_question_bank in (False, True):
+        bob_texts = generate(client, bob, use_question_bank)
+        alice_texts = generate(client, alice, use_question_bank)
+        assert not any(text in PRIVATE_TEXTS for text in bob_texts)
+        assert "BOB SORUSU kimya atom yarıçapı?" not in alice_texts
+
+
+def test_bank_only_used_when_requested(client, register):
+    alice = register("Alice")
+    import_quiz(client, alice, PRIVATE_TEXTS)
+
+    assert not set(PRIVATE_TEXTS) & set(generate(client, alice, use_question_bank=False))
+    assert set(PRIVATE_TEXTS) <= set(generate(client, alice, use_question_bank=True))
+
+
+def test_deleted_questions_leave_the_bank(client, register):
+    alice = register("Alice")
+    import_quiz(client, alice, PRIVATE_TEXTS)
+    quiz_id = client.get("/api/quizzes/", headers=alice).json()["quizzes"][0]["id"]
+    assert client.delete(f"/api/quizzes/{quiz_id}", headers=alice).status_code == 200
+
+    assert not set(PRIVATE_TEXTS) & set(generate(client, alice, use_question_bank=True))
+
+
+def test_cached_bank_follows_writes_without_reloading(client, register, monkeypatch):
+    alice = register("Alice")
+    import_quiz(client, alice, PRIVATE_TEXTS[:1])
+    assert PRIVATE_TEXTS[0] in generate(client, alice, use_question_bank=True)
+
+    loads = []
+    original_load = QuestionBank.load.__func__
+    monkeypatch.setattr(QuestionBank, "load", classmethod(
+        lambda cls, db, owner_id: loads.append(owner_id) or original_load(cls, db, owner_id)
+    ))
+
+    import_quiz(client, alice, PRIVATE_TEXTS[1:])
+    assert PRIVATE_TEXTS[1] in generate(client, alice, use_question_bank=True)
+
+    for quiz in client.get("/api/quizzes/", headers=alice).json()["quizzes"]:
+        assert client.delete(f"/api/quizzes/{quiz['id']}", headers=alice).status_code == 200
+    assert not set(PRIVATE_TEXTS) & set(generate(client, alice, use_question_bank=True))
+    assert loads == []
@@ -0,0 +1,41 @@
+from sqlalchemy import create_engine, text
+
+from app.search import SQLITE_DDL, create_search_index
+
+
+def import_quiz(client, headers, title, question):
+    line = f'{{"title": "{title}", "prompt": "p", "questions": [' \
+           f'{{"text": "{question}", "options": ["1", "2", "3", "4"], "correct": 0}}]}}'
+    response = client.post("/api/quizzes/import", content=line + "\n", headers=headers)
+    assert response.json()["imported_quizzes"] == 1, response.text
+
+
+def test_search_only_returns_own_quizzes(client, register):
+    alice, bob = register("Alice"), register("Bob")
+    import_quiz(client, alice, "Fotosentez", "Klorofil hangi renktedir?")
+    import_quiz(client, bob, "Fotosentez tekrarı", "Klorofil nerede bulunur?")
+
+    response = client.get("/api/quizzes/search", params={"q": "klorofil"}, headers=alice).json()
+    assert response["total"] == 1
+    assert [result["title"] for result in response["results"]] == ["Fotosentez"]
+    assert "<mark>" in response["results"][0]["snippet"]
+
+
+def test_owner_id_is_not_matched_by_query_terms(client, register):
+    alice = register("Alice")
+    import_quiz(client, alice, "Mitoz", "Hücre bölünmesi kaç evrelidir?")
+    owner_id = client.get("/api/quizzes/", headers=alice).json()["quizzes"][0]["owner_id"]
+
+    response = client.get("/api/quizzes/search", params={"q": str(owner_id)}, headers=alice).json()
+    assert response["total"] == 0
+
+
+def test_unindexed_owner_table_is_recreated(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(SQLITE_DDL[0].replace("owner_id,", "owner_id UNINDEXED,")))
+
+    create_search_index(engine)
+    with engine.connect() as conn:
+        ddl = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'quiz_search'")).scalar()
+    assert "UNINDEXED" not in ddl
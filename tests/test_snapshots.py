@@ -0,0 +1,20 @@
+from sqlalchemy import delete
+
+from app.database import SessionLocal
+from app.models import QuizSnapshot
+
+
+def test_read_without_snapshot_does_not_write_one(client, register):
+    headers = register("Teacher")
+    created = client.post("/api/quizzes/", headers=headers, json={
+        "title": "Tarih", "prompt": "p", "question_count": 2
+    }).json()
+    with SessionLocal() as db:
+        db.execute(delete(QuizSnapshot).where(QuizSnapshot.quiz_id == created["id"]))
+        db.commit()
+
+    response = client.get(f"/api/quizzes/{created['id']}", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == created
+    with SessionLocal() as db:
+        assert db.get(QuizSnapshot, created["id"]) is None
@@ -0,0 +1,17 @@
+import json
+
+
+def test_import_reports_out_of_range_correct(client, register):
+    headers = register("Teacher")
+    lines = [
+        {"title": "Tarih", "prompt": "p", "questions": [{"text": "Soru?", "options": ["a", "b"], "correct": 1}]},
+        {"title": "Tarih", "prompt": "p", "questions": [{"text": "Soru?", "options": ["a", "b"], "correct": 2}]},
+    ]
+    response = client.post(
+        "/api/quizzes/import", headers=headers, content="\n".join(json.dumps(line) for line in lines)
+    )
+    result = response.json()
+    assert result["imported_quizzes"] == 1
+    assert result["error_count"] == 1
+    assert result["errors"][0]["line"] == 2
+    assert result["errors"][0]["error"].startswith("questions.0")
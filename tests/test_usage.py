@@ -0,0 +1,29 @@
+from app.llm_router import Completion
+from app.usage import MIXED_MODELS, GenerationUsage, estimate_cost
+
+
+def _completion(model: str, prompt_tokens: int, completion_tokens: int) -> Completion:
+    completion = Completion("gemini", model)
+    completion.prompt_tokens = prompt_tokens
+    completion.completion_tokens = completion_tokens
+    return completion
+
+
+def test_single_model_row():
+    usage = GenerationUsage()
+    usage.add(_completion("gemini-1.5-flash", 1000, 500), "prompt")
+    row = usage.to_row(1, 1, 5)
+    assert row["model"] == "gemini:gemini-1.5-flash"
+    assert row["cost_usd"] == estimate_cost("gemini-1.5-flash", 1000, 500)
+
+
+def test_mixed_models_are_priced_per_call():
+    usage = GenerationUsage()
+    usage.add(_completion("gemini-1.5-flash-8b", 1000, 500), "prompt")
+    usage.add(_completion("gemini-1.5-pro", 2000, 100), "prompt")
+    row = usage.to_row(1, 1, 5)
+    assert row["model"] == MIXED_MODELS
+    assert usage.models == ["gemini:gemini-1.5-flash-8b", "gemini:gemini-1.5-pro"]
+    assert row["cost_usd"] == estimate_cost("gemini-1.5-flash-8b", 1000, 500) + estimate_cost("gemini-1.5-pro", 2000, 100)
+    assert row["prompt_tokens"] == 3000
+    assert row["llm_calls"] == 2